@@ -0,0 +1,20 @@
+import os
+
+from fitness_data import load_catalog
+
+# Shared setup for the bulk tools that spread data files across worker processes (validate_schedules.py
+# and migrate_data.py): each worker loads the catalog once, and files are found with a lazy folder walk.
+
+worker_exercise_data = {}  # Catalog loaded once per worker process (see init_worker)
+
+def init_worker(catalog_file):
+    # Runs once in each worker process to load the exercise catalog
+    exercise_data, _ = load_catalog(catalog_file)
+    worker_exercise_data.update(exercise_data)
+
+def find_json_files(root_folder):
+    # Walks the folder tree lazily so huge archives never have to be listed in memory all at once
+    for folder_path, _, file_names in os.walk(root_folder):
+        for file_name in sorted(file_names):
+            if file_name.endswith(".json"):
+                yield os.path.join(folder_path, file_name)
@@ -0,0 +1,172 @@
+import os
+import sys
+import json
+import time
+import zlib
+import atexit
+import struct
+import argparse
+
+from fitness_data import (CATALOG_FILE, load_catalog, blank_schedule, make_exercise, plan_schedule,
+                          add_exercises_to_schedule, swap_exercises_in_schedule, write_schedule)
+from schedule_rules import day_selection_problem, muscle_assignment_problems, blocked_muscles
+
+# Append-only log of every wizard action (days selected, muscles assigned, exercises added or swapped,
+# resets), so a user's session can be rebuilt and replayed offline. Events are kept in memory and written in batches:
+# each batch is one zlib-compressed block of JSON lines, prefixed with its length. A batch is written every
+# BATCH_SIZE events, at exit, and whenever the apps flush after saving a wizard step (so a crash or a killed
+# app loses at most the step that was not saved yet). When the log passes
+# MAX_LOG_BYTES it is rotated ("events.log" -> "events.log.1" -> ...), keeping BACKUP_COUNT old files.
+# Run "python event_log.py" to replay the log headlessly and time each step.
+EVENT_LOG_FILE = "events.log"
+BATCH_SIZE = 50                 # Events held in memory before a block is written
+MAX_LOG_BYTES = 1024 * 1024     # Size at which the log is rotated
+BACKUP_COUNT = 5                # Rotated files kept ("events.log.1" is the newest)
+BLOCK_HEADER = struct.Struct(">I")  # Length of the compressed block that follows
+
+class EventLog:
+    # Collects events for one app session and appends them to the log file in compressed batches
+    def __init__(self, filename=EVENT_LOG_FILE, batch_size=BATCH_SIZE, max_bytes=MAX_LOG_BYTES,
+                 backup_count=BACKUP_COUNT, enabled=True):
+        self.filename = filename
+        self.enabled = enabled  # A disabled log ignores every event (e.g. when only measuring startup time)
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.pending_lines = []  # Events are turned into JSON straight away, so later edits can't change them
+        self.session_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.session_started = time.monotonic()
+        if enabled:
+            atexit.register(self.flush)  # Whatever is still pending is written when the app exits
+
+    def log(self, action, **details):
+        # Records one action; "elapsed" is seconds since the session started (for timing user steps)
+        if not self.enabled:
+            return
+        self.pending_lines.append(json.dumps({"session": self.session_id, "time": round(time.time(), 3),
+                                              "elapsed": round(time.monotonic() - self.session_started, 3),
+                                              "action": action, **details}) + "\n")
+        if len(self.pending_lines) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # Writes the pending events as one compressed block, rotating the log first if it is full
+        if not self.pending_lines:
+            return
+        compressed_block = zlib.compress("".join(self.pending_lines).encode("utf-8"))
+        self.pending_lines = []
+        try:
+            if os.path.getsize(self.filename) >= self.max_bytes:
+                self.rotate()
+        except FileNotFoundError:
+            pass
+        with open(self.filename, "ab") as log_file:  # One write per block, so blocks never interleave
+            log_file.write(BLOCK_HEADER.pack(len(compressed_block)) + compressed_block)
+
+    def rotate(self):
+        # Shifts "events.log.N" up by one (dropping the oldest) and starts a new log file
+        for backup_number in range(self.backup_count - 1, 0, -1):
+            older_name = f"{self.filename}.{backup_number}"
+            if os.path.exists(older_name):
+                os.replace(older_name, f"{self.filename}.{backup_number + 1}")
+        if self.backup_count > 0:
+            os.replace(self.filename, f"{self.filename}.1")
+        else:
+            os.remove(self.filename)
+
+def log_file_names(filename=EVENT_LOG_FILE):
+    # The log and its rotated files, oldest first
+    backup_names = []
+    backup_number = 1
+    while os.path.exists(f"{filename}.{backup_number}"):
+        backup_names.append(f"{filename}.{backup_number}")
+        backup_number += 1
+    return list(reversed(backup_names)) + ([filename] if os.path.exists(filename) else [])
+
+def read_events(filename=EVENT_LOG_FILE):
+    # Yields every logged event in order, one block at a time (a block cut short by a crash is skipped)
+    for log_name in log_file_names(filename):
+        with open(log_name, "rb") as log_file:
+            while True:
+                header = log_file.read(BLOCK_HEADER.size)
+                if len(header) < BLOCK_HEADER.size:
+                    break
+                compressed_block = log_file.read(BLOCK_HEADER.unpack(header)[0])
+                try:
+                    block_text = zlib.decompress(compressed_block).decode("utf-8")
+                except zlib.error:
+                    break
+                for line in block_text.splitlines():
+                    yield json.loads(line)
+
+def replay_event(schedule_data, event):
+    # Re-runs the engine work the app did for one event and returns (schedule afterwards, problem or None)
+    action = event["action"]
+    if action == "session_started" or action == "schedule_merged":
+        return event["schedule"], None
+    if action == "reset":
+        return blank_schedule(), None
+    if action == "days_selected":
+        return schedule_data, day_selection_problem(event["days"])
+    if action == "muscles_assigned":
+        muscles_by_day = event["muscles_by_day"]
+        selected_days = list(muscles_by_day)
+        blocked_muscles(selected_days, muscles_by_day)
+        first_problem = next(muscle_assignment_problems(selected_days, muscles_by_day), None)
+        if first_problem:  # The app does not save a plan with problems
+            return schedule_data, first_problem[2]
+        return plan_schedule(schedule_data, muscles_by_day), None
+    if action == "exercises_added":
+        exercise_objects = [make_exercise(exercise["name"], event["muscle"], exercise["focus_type"])
+                            for exercise in event["exercises"]]
+        add_exercises_to_schedule(schedule_data, event["muscle"], exercise_objects)
+        return schedule_data, None
+    if action == "exercises_swapped":
+        swap_exercises_in_schedule(schedule_data, event["swaps"])
+        return schedule_data, None
+    return schedule_data, f"Unknown action {action!r}"
+
+def replay_sessions(events, exercise_data, muscle_group_data, session_id=None, with_recovery=True):
+    # Replays logged sessions headlessly. Yields (event, step report) per event; the report holds the time
+    # the engine took for the step and the schedule state after it. with_recovery also re-runs the recovery
+    # model after each step, as the GUI does when it refreshes the main window.
+    if with_recovery:
+        import recovery_model
+    session_schedules = {}
+    for event in events:
+        if session_id is not None and event["session"] != session_id:
+            continue
+        schedule_data = session_schedules.get(event["session"], blank_schedule())
+        started = time.perf_counter()
+        schedule_data, problem = replay_event(schedule_data, event)
+        if with_recovery and schedule_data.get("workout_schedule"):
+            recovery_model.recovery_warnings(schedule_data, exercise_data, muscle_group_data)
+        step_seconds = time.perf_counter() - started
+        session_schedules[event["session"]] = schedule_data
+        yield event, {"session": event["session"], "action": event["action"], "elapsed": event["elapsed"],
+                      "replay_ms": round(step_seconds * 1000, 3), "problem": problem, "schedule": schedule_data}
+
+def main(argument_list=None):
+    parser = argparse.ArgumentParser(description="Replay logged app sessions headlessly and time each step.")
+    parser.add_argument("--log", default=EVENT_LOG_FILE, help="event log to read (rotated files included)")
+    parser.add_argument("--catalog", default=CATALOG_FILE)
+    parser.add_argument("--session", default=None, help="only replay this session id")
+    parser.add_argument("--until", type=int, default=None, help="stop after this many replayed events")
+    parser.add_argument("--output", default=None, help="write the final schedule of the last session here")
+    parser.add_argument("--no-recovery", action="store_true", help="skip re-running the recovery model")
+    arguments = parser.parse_args(argument_list)
+
+    exercise_data, muscle_group_data = load_catalog(arguments.catalog)
+    step_report = None
+    for step_number, (_, step_report) in enumerate(replay_sessions(read_events(arguments.log), exercise_data,
+                                                                   muscle_group_data, arguments.session,
+                                                                   not arguments.no_recovery), start=1):
+        sys.stdout.write(json.dumps({key: value for key, value in step_report.items() if key != "schedule"}) + "\n")
+        if arguments.until is not None and step_number >= arguments.until:
+            break
+    if arguments.output and step_report is not None:
+        write_schedule(step_report["schedule"], arguments.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import os
+import sys
+import copy
+import json
+import argparse
+
+from fitness_data import (CATALOG_FILE, SCHEDULE_FILE, load_catalog, load_exercise_details, exercise_from_entry,
+                          find_muscle_for_exercise, exercise_sub_muscles, exercise_equipment, catalog_equipment,
+                          swap_exercises_in_schedule, load_roster_schedules)
+from migrate_data import upgrade_schedule
+from schedule_lock import save_schedule_checked
+from schedule_model import ScheduleModel
+
+# Substitute exercises for when a station is broken or a home user lacks some equipment.
+# Each catalog exercise lists its equipment and the sub-muscles it targets ("exercise_details" in the catalog).
+# SubstituteIndex ranks every exercise's alternatives from the same muscle group once, by sub-muscle overlap
+# (shared sub-muscles / all sub-muscles either one trains), so a lookup is a single dictionary access.
+# Swapping works in two steps, so a whole roster is handled in one batched pass:
+#   1. plan_swaps reads a schedule and lists every exercise that needs equipment that is unavailable, with
+#      its best available substitute (answers are cached per exercise for the whole batch)
+#   2. fitness_data.swap_exercises_in_schedule rewrites it; a substitute keeps the original's intensity, sets and reps
+# Run "python exercise_substitutes.py --unavailable barbell" to check the schedule (or --roster FOLDER).
+
+def sub_muscle_overlap(first_sub_muscles, second_sub_muscles):
+    # Shared sub-muscles as a fraction of all the sub-muscles either exercise trains (0 to 1)
+    all_sub_muscles = first_sub_muscles | second_sub_muscles
+    return len(first_sub_muscles & second_sub_muscles) / len(all_sub_muscles) if all_sub_muscles else 0.0
+
+class SubstituteIndex:
+    # Every exercise's substitutes, ranked once when the index is built
+    def __init__(self, exercise_data, muscle_group_data, exercise_details):
+        self.exercise_details = exercise_details
+        self.known_equipment = catalog_equipment(exercise_details)
+        self.ranked_substitutes = {}  # (muscle, exercise) -> [(substitute, overlap)], best first
+        self.available_substitutes = {}  # (muscle, exercise, unavailable equipment) -> ranked substitute names
+        for muscle_name, exercise_names in exercise_data.items():
+            targets = {exercise_name: set(exercise_sub_muscles(exercise_name, muscle_name, muscle_group_data,
+                                                               exercise_details))
+                       for exercise_name in exercise_names}
+            for exercise_name in exercise_names:
+                substitutes = [(other_name, round(sub_muscle_overlap(targets[exercise_name], targets[other_name]), 3))
+                               for other_name in exercise_names if other_name != exercise_name]
+                substitutes.sort(key=lambda substitute: -substitute[1])  # Ties keep catalog order
+                self.ranked_substitutes[(muscle_name, exercise_name)] = substitutes
+
+    def equipment_for(self, exercise_name):
+        return exercise_equipment(exercise_name, self.exercise_details)
+
+    def unknown_equipment(self, equipment_names):
+        # The names no catalog exercise uses (usually typos like "barbells"), sorted; they would match nothing
+        return sorted(set(equipment_names) - self.known_equipment)
+
+    def substitutes(self, exercise_name, muscle_name):
+        # Ranked [(substitute, overlap)] for an exercise of muscle_name (empty if it is not in the catalog)
+        return self.ranked_substitutes.get((muscle_name, exercise_name), [])
+
+    def is_available(self, exercise_name, unavailable_equipment):
+        return not unavailable_equipment.intersection(self.equipment_for(exercise_name))
+
+    def best_substitute(self, exercise_name, muscle_name, unavailable_equipment, planned_names=()):
+        # Highest-ranked substitute that needs none of the unavailable equipment (a frozenset) and is not
+        # already planned, or None
+        lookup_key = (muscle_name, exercise_name, unavailable_equipment)
+        if lookup_key not in self.available_substitutes:
+            self.available_substitutes[lookup_key] = [
+                substitute_name for substitute_name, _ in self.substitutes(exercise_name, muscle_name)
+                if self.is_available(substitute_name, unavailable_equipment)]
+        return next((substitute_name for substitute_name in self.available_substitutes[lookup_key]
+                     if substitute_name not in planned_names), None)
+
+def plan_swaps(schedule_data, unavailable_equipment, substitute_index, exercise_data):
+    # Finds every planned exercise that needs unavailable equipment. Returns (swaps, stuck): swaps are
+    # {"day", "exercise", "replacement"} dictionaries, stuck lists "Day: exercise" with no usable substitute.
+    unavailable_equipment = frozenset(unavailable_equipment)
+    swaps = []
+    stuck = []
+    for day_entry in schedule_data["workout_schedule"]:
+        planned_names = {exercise_from_entry(exercise_entry).exercise_name
+                         for exercise_entry in day_entry["exercises"]}
+        for exercise_entry in day_entry["exercises"]:
+            exercise_obj = exercise_from_entry(exercise_entry)
+            if substitute_index.is_available(exercise_obj.exercise_name, unavailable_equipment):
+                continue
+            muscle_name = exercise_obj.muscle_group or find_muscle_for_exercise(
+                exercise_obj.exercise_name, day_entry["workout_purpose"], exercise_data)
+            # An exercise already planned for the day is not a real substitute
+            replacement_name = substitute_index.best_substitute(exercise_obj.exercise_name, muscle_name,
+                                                                unavailable_equipment, planned_names)
+            if replacement_name is None:
+                stuck.append(f"{day_entry['name']}: {exercise_obj.exercise_name}")
+                continue
+            planned_names.add(replacement_name)
+            swaps.append({"day": day_entry["name"], "exercise": exercise_obj.exercise_name,
+                          "replacement": replacement_name})
+    return swaps, stuck
+
+def swap_roster_exercises(roster_schedules, unavailable_equipment, substitute_index, exercise_data):
+    # One batched pass over every member's schedule. Returns {member: (upgraded copy of the schedule with the
+    # swaps applied, swaps, stuck)}; members with nothing to change are left out.
+    roster_results = {}
+    for member_name, schedule_data in roster_schedules.items():
+        # Older saves store exercises as strings; the copy leaves roster_schedules as it was read
+        schedule_data = copy.deepcopy(upgrade_schedule(schedule_data, exercise_data))
+        swaps, stuck = plan_swaps(schedule_data, unavailable_equipment, substitute_index, exercise_data)
+        if swaps or stuck:
+            swap_exercises_in_schedule(schedule_data, swaps)
+            roster_results[member_name] = (schedule_data, swaps, stuck)
+    return roster_results
+
+def main(argument_list=None):
+    parser = argparse.ArgumentParser(description="Swap exercises that need unavailable equipment.")
+    parser.add_argument("--unavailable", action="append", default=[],
+                        help="equipment that can't be used (repeat or separate with commas)")
+    parser.add_argument("--schedule", default=SCHEDULE_FILE, help="schedule file to check")
+    parser.add_argument("--roster", default=None, help="check every <member>.json in this folder instead")
+    parser.add_argument("--catalog", default=CATALOG_FILE)
+    parser.add_argument("--show", default=None, help="only print the ranked substitutes for this exercise")
+    parser.add_argument("--apply", action="store_true", help="write the changed schedules back")
+    arguments = parser.parse_args(argument_list)
+
+    exercise_data, muscle_group_data = load_catalog(arguments.catalog)
+    substitute_index = SubstituteIndex(exercise_data, muscle_group_data, load_exercise_details(arguments.catalog))
+    if arguments.show:
+        for muscle_name, exercise_names in exercise_data.items():
+            if arguments.show in exercise_names:
+                sys.stdout.write(json.dumps({"muscle": muscle_name, "exercise": arguments.show,
+                                             "substitutes": substitute_index.substitutes(arguments.show,
+                                                                                         muscle_name)}) + "\n")
+        return 0
+
+    unavailable_equipment = {equipment_name.strip().lower() for equipment_list in arguments.unavailable
+                             for equipment_name in equipment_list.split(",") if equipment_name.strip()}
+    unknown_equipment = substitute_index.unknown_equipment(unavailable_equipment)
+    if unknown_equipment:
+        parser.error(f"unknown equipment: {', '.join(unknown_equipment)} "
+                     f"(the catalog has: {', '.join(sorted(substitute_index.known_equipment))})")
+    if arguments.roster:
+        roster_schedules = load_roster_schedules(arguments.roster)
+        roster_results = swap_roster_exercises(roster_schedules, unavailable_equipment, substitute_index,
+                                               exercise_data)
+        for member_name, (schedule_data, swaps, stuck) in roster_results.items():
+            sys.stdout.write(json.dumps({"member": member_name, "swaps": swaps, "stuck": stuck}) + "\n")
+            if arguments.apply and swaps:
+                # Saved like the apps save (locked, versioned, merged with any save made since it was read)
+                _, merge_conflicts = save_schedule_checked(
+                    schedule_data, upgrade_schedule(roster_schedules[member_name], exercise_data),
+                    os.path.join(arguments.roster, f"{member_name}.json"), exercise_data=exercise_data)
+                for conflict in merge_conflicts:
+                    print(f"{member_name}: {conflict}", file=sys.stderr)
+        swap_count = sum(len(swaps) for _, swaps, _ in roster_results.values())
+    else:
+        # The user's own schedule is saved through the schedule model (locked, versioned, merged like the apps)
+        schedule_model = ScheduleModel(arguments.schedule)
+        schedule_model.hydrate(exercise_data)
+        swaps, stuck = plan_swaps(schedule_model.schedule, unavailable_equipment, substitute_index, exercise_data)
+        sys.stdout.write(json.dumps({"schedule": arguments.schedule, "swaps": swaps, "stuck": stuck}) + "\n")
+        if arguments.apply and swaps:
+            schedule_model.swap_exercises(swaps)
+            schedule_model.save()
+        swap_count = len(swaps)
+    print(f"{swap_count} swap(s) for {', '.join(sorted(unavailable_equipment)) or 'no equipment'}.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
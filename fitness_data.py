@@ -0,0 +1,263 @@
+import os
+import json
+import tempfile
+
+# Shared data, exercise classes and file loading for the fitness app; kept free of tkinter so it is cheap to import.
+# The catalog and intensity profiles ship with the app, so they are found next to this file wherever the tools
+# are run from. The schedule is the user's own file and stays in the working folder (as in V3 and V4).
+APP_FOLDER = os.path.dirname(os.path.abspath(__file__))
+CATALOG_FILE = os.path.join(APP_FOLDER, "V3-5bothEandM.json")  # Exercises and muscle groups (with sub-muscles)
+SCHEDULE_FILE = "V3-5schedule.json"    # The user's saved weekly schedule
+
+# Saved schedules with "format": 2 store each exercise as a dictionary (see Exercise.to_entry).
+# Older files (V3-V5) store rendered strings like "Hip Thrusts (Hypertrophy) - 4x12"; migrate_data.py upgrades them.
+SCHEDULE_FORMAT = 2
+
+# Days of the week in order, used for sorting and for building blank schedules.
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Sets, rep range, %1RM, RPE and rest for each intensity
+INTENSITY_FILE = os.path.join(APP_FOLDER, "intensity_profiles.json")
+
+# Intensity profiles are data, so new intensities can be added by editing intensity_profiles.json.
+intensity_profiles = {}   # Focus type name -> profile dictionary, filled on first use
+intensity_settings = {"default_intensity": "Hypertrophy"}  # Used for unknown focus types
+
+def get_intensity_profiles(filename=INTENSITY_FILE):
+    # Loads the intensity profiles the first time they are needed and returns them
+    if not intensity_profiles:
+        with open(filename, "r") as profile_file:
+            profile_data = json.load(profile_file)
+        intensity_profiles.update(profile_data["intensity_profiles"])
+        intensity_settings["default_intensity"] = profile_data.get("default_intensity", "Hypertrophy")
+    return intensity_profiles
+
+# Per-exercise details from the catalog (equipment and the sub-muscles each exercise targets)
+exercise_details = {}     # Exercise name -> details dictionary, filled on first use
+
+def get_exercise_details(filename=CATALOG_FILE):
+    # Loads the exercise details the first time they are needed and returns them
+    if not exercise_details:
+        exercise_details.update(load_exercise_details(filename))
+    return exercise_details
+
+def get_default_intensity():
+    # The intensity preselected in the GUI and used when a saved focus type is unknown
+    get_intensity_profiles()
+    return intensity_settings["default_intensity"]
+
+def describe_intensity(focus_type):
+    # Readable one-line summary of an intensity, e.g. "Strength: 5x6 reps - focuses on power and heavy load."
+    profile = get_intensity_profiles()[focus_type]
+    return f"{focus_type}: {profile['sets']}x{profile['rep_range'][1]} reps - {profile['description']}"
+
+class Exercise:
+    # Base class containing universal exercise attributes
+    def __init__(self, exercise_name, muscle_group, sets, reps, focus_type, rest_seconds=90,
+                 percent_one_rep_max=None, rpe=None):
+        self.exercise_name = exercise_name
+        self.muscle_group = muscle_group
+        self.sets = sets
+        self.reps = reps
+        self.focus_type = focus_type
+        self.rest_seconds = rest_seconds  # Rest between sets, used by the live workout session
+        self.percent_one_rep_max = percent_one_rep_max  # Target load as a fraction of the member's 1RM
+        self.rpe = rpe  # Target rate of perceived exertion
+
+    def get_info(self):
+        # Returns formatted string with full exercise info
+        return f"{self.exercise_name} ({self.focus_type}) - {self.sets}x{self.reps}"
+
+    def to_entry(self):
+        # Returns the dictionary stored for this exercise in a saved schedule
+        return {"name": self.exercise_name, "muscle": self.muscle_group, "focus_type": self.focus_type,
+                "sets": self.sets, "reps": self.reps}
+
+def make_exercise(exercise_name, muscle_group, focus_type):
+    # Creates an Exercise using the sets, reps (top of the rep range), load and rest of an intensity profile
+    profiles = get_intensity_profiles()
+    if focus_type not in profiles:
+        focus_type = get_default_intensity()
+    profile = profiles[focus_type]
+    return Exercise(exercise_name, muscle_group, profile["sets"], profile["rep_range"][1], focus_type,
+                    profile["rest_seconds"], profile["percent_one_rep_max"], profile["rpe"])
+
+def split_exercise_info(exercise_info):
+    # Splits a saved string like "Hip Thrusts (Hypertrophy) - 4x12" into (name, focus type, "sets x reps" text).
+    # The focus type is None for a plain exercise name without an intensity.
+    name_part, _, set_rep_part = exercise_info.rpartition(" - ")
+    if " (" in name_part:
+        exercise_name, _, focus_type = name_part.rpartition(" (")
+        return exercise_name, focus_type.rstrip(")"), set_rep_part
+    return exercise_info, None, set_rep_part
+
+def parse_exercise_info(exercise_info, muscle_group=""):
+    # Turns a saved string like "Hip Thrusts (Hypertrophy) - 4x12" back into an Exercise object
+    exercise_name, focus_type, set_rep_part = split_exercise_info(exercise_info)
+    exercise_obj = make_exercise(exercise_name, muscle_group, focus_type or get_default_intensity())
+    sets, _, reps = set_rep_part.partition("x")
+    if sets.isdigit() and reps.isdigit():  # Keeps the saved sets/reps if the string was edited
+        exercise_obj.sets = int(sets)
+        exercise_obj.reps = int(reps)
+    return exercise_obj
+
+def exercise_from_entry(exercise_entry, muscle_group=""):
+    # Turns a saved exercise (a format 2 dictionary or an older rendered string) into an Exercise object
+    if isinstance(exercise_entry, str):
+        return parse_exercise_info(exercise_entry, muscle_group)
+    exercise_obj = make_exercise(exercise_entry["name"], exercise_entry.get("muscle") or muscle_group,
+                                 exercise_entry.get("focus_type"))
+    exercise_obj.sets = exercise_entry.get("sets", exercise_obj.sets)
+    exercise_obj.reps = exercise_entry.get("reps", exercise_obj.reps)
+    return exercise_obj
+
+def find_muscle_for_exercise(exercise_name, day_muscles, exercise_data):
+    # Finds which of the day's muscles the exercise belongs to (empty string if none of them)
+    for muscle_name in day_muscles:
+        if exercise_name in exercise_data.get(muscle_name, []):
+            return muscle_name
+    return ""
+
+def exercise_sub_muscles(exercise_name, muscle_group, muscle_group_data, details=None):
+    # The sub-muscles of muscle_group an exercise trains, from its catalog details (details defaults to the
+    # shared exercise details). Exercises without sub-muscle details count as training the whole group.
+    group_sub_muscles = muscle_group_data.get(muscle_group, [])
+    if details is None:
+        details = get_exercise_details()
+    targeted = details.get(exercise_name, {}).get("sub_muscles", [])
+    return [sub_muscle for sub_muscle in group_sub_muscles if sub_muscle in targeted] or group_sub_muscles
+
+def exercise_equipment(exercise_name, details=None):
+    # The equipment an exercise needs, from its catalog details (details defaults to the shared exercise details)
+    if details is None:
+        details = get_exercise_details()
+    return details.get(exercise_name, {}).get("equipment", [])
+
+def catalog_equipment(details=None):
+    # Every piece of equipment some catalog exercise needs (the names users can mark as unavailable)
+    if details is None:
+        details = get_exercise_details()
+    return {equipment_name for exercise_name in details
+            for equipment_name in exercise_equipment(exercise_name, details)}
+
+def describe_muscle_hit(muscle_name, muscle_group_data):
+    # Creates readable string listing all sub-muscles for a given group
+    sub_muscles = muscle_group_data.get(muscle_name, [])
+    last = sub_muscles[-1]
+    others = ", ".join(sub_muscles[:-1])
+    return f"{muscle_name}: Containing the {others}, and {last}."
+
+# Schedule operations shared by every frontend (V5 GUI and terminal_app.py), so they build identical schedules.
+def plan_schedule(schedule_data, muscles_by_day):
+    # Returns a new schedule where the days in muscles_by_day ({day: [muscles]}) are workout days and the
+    # rest are rest days. Exercises already saved for a day that stays a workout day are kept.
+    existing_exercise_map = {day_entry["name"]: list(day_entry.get("exercises", []))
+                             for day_entry in schedule_data.get("workout_schedule", [])}
+    planned_schedule = {"format": SCHEDULE_FORMAT, "workout_schedule": []}
+    for day_name in DAY_ORDER:
+        is_rest_day = day_name not in muscles_by_day
+        planned_schedule["workout_schedule"].append({
+            "name": day_name,
+            "rest": is_rest_day,
+            "workout_purpose": [] if is_rest_day else list(muscles_by_day[day_name]),
+            "exercises": [] if is_rest_day else existing_exercise_map.get(day_name, [])
+        })
+    return planned_schedule
+
+def add_exercises_to_schedule(schedule_data, muscle_name, exercise_objects):
+    # Adds the exercises to every day of the schedule that trains muscle_name (skipping ones already there).
+    # Changes schedule_data in place and returns the names of the days that were changed.
+    changed_days = []
+    for day_entry in schedule_data["workout_schedule"]:
+        if muscle_name in day_entry["workout_purpose"]:
+            for exercise_obj in exercise_objects:
+                exercise_entry = exercise_obj.to_entry()
+                if exercise_entry not in day_entry["exercises"]:
+                    day_entry["exercises"].append(exercise_entry)
+                    if day_entry["name"] not in changed_days:
+                        changed_days.append(day_entry["name"])
+    return changed_days
+
+def swap_exercises_in_schedule(schedule_data, swaps):
+    # Replaces exercises in place; each swap is {"day", "exercise", "replacement"} and the replacement keeps
+    # the original's muscle, intensity, sets and reps. Returns the names of the days that were changed.
+    day_entries = {day_entry["name"]: day_entry for day_entry in schedule_data["workout_schedule"]}
+    changed_days = []
+    for swap in swaps:
+        day_exercises = day_entries[swap["day"]]["exercises"]
+        for exercise_index, exercise_entry in enumerate(day_exercises):
+            exercise_obj = exercise_from_entry(exercise_entry)
+            if exercise_obj.exercise_name == swap["exercise"]:
+                exercise_obj.exercise_name = swap["replacement"]
+                day_exercises[exercise_index] = exercise_obj.to_entry()
+                if swap["day"] not in changed_days:
+                    changed_days.append(swap["day"])
+                break
+    return changed_days
+
+def describe_schedule(schedule_data):
+    # Readable summary of every day's status, muscles and exercises
+    summary_text = ""
+    for day_entry in schedule_data["workout_schedule"]:
+        day_status = "Rest Day" if day_entry["rest"] else "Workout Day"
+        muscle_string = ", ".join(day_entry["workout_purpose"]) if day_entry["workout_purpose"] else "None"
+        exercise_string = ", ".join(exercise_from_entry(exercise_entry).get_info()
+                                    for exercise_entry in day_entry["exercises"]) or "None"
+        summary_text += f"\n{day_entry['name']}: {day_status}\n"
+        summary_text += f"  Muscles: {muscle_string}\n  Exercises: {exercise_string}\n"
+    return summary_text
+
+# Functions here handle loading and saving the catalog and schedule files.
+def load_catalog(filename=CATALOG_FILE):
+    # Reads the exercise catalog and returns (exercise_data, muscle_group_data)
+    with open(filename, "r") as file:
+        file_data = json.load(file)
+    return file_data["exercises"], file_data["muscle_groups"]
+
+def load_exercise_details(filename=CATALOG_FILE):
+    # Reads the per-exercise details from the catalog, e.g.
+    # {"Chest Dips": {"equipment": ["dip station"], "sub_muscles": ["lower chest"]}}
+    # (older catalogs have none: every exercise then needs no equipment and trains its whole muscle group)
+    with open(filename, "r") as file:
+        return json.load(file).get("exercise_details", {})
+
+def blank_schedule():
+    # Blank template of the workout schedule: every day is a rest day
+    return {
+        "format": SCHEDULE_FORMAT,
+        "workout_schedule": [
+            {"name": day_name, "rest": True, "workout_purpose": [], "exercises": []}
+            for day_name in DAY_ORDER
+        ]
+    }
+
+def load_schedule(filename=SCHEDULE_FILE):
+    # Loads the saved schedule, or a blank template if the file has not been created yet
+    try:
+        with open(filename, "r") as schedule_file:
+            return json.load(schedule_file)
+    except FileNotFoundError:
+        return blank_schedule()
+
+def write_json_atomic(json_data, filename):
+    # Writes any JSON data to disk. The file is written to a temporary file first and then
+    # swapped in, so other programs reading it never see a half-written file.
+    folder_path = os.path.dirname(os.path.abspath(filename))
+    with tempfile.NamedTemporaryFile("w", dir=folder_path, suffix=".tmp", delete=False) as temporary_file:
+        json.dump(json_data, temporary_file, indent=2)
+        temporary_file.flush()
+        os.fsync(temporary_file.fileno())
+    os.replace(temporary_file.name, filename)
+
+def write_schedule(schedule_data, filename=SCHEDULE_FILE):
+    # Writes a schedule dictionary to disk (safely, see write_json_atomic)
+    write_json_atomic(schedule_data, filename)
+
+def load_roster_schedules(roster_folder):
+    # Reads every "<member>.json" schedule in a folder, keyed by member name
+    roster_schedules = {}
+    for file_name in sorted(os.listdir(roster_folder)):
+        if file_name.endswith(".json"):
+            with open(os.path.join(roster_folder, file_name), "r") as schedule_file:
+                roster_schedules[file_name[:-len(".json")]] = json.load(schedule_file)
+    return roster_schedules
@@ -0,0 +1,260 @@
+import os
+import sys
+import json
+import zlib
+import argparse
+import datetime
+from array import array
+
+from fitness_data import SCHEDULE_FORMAT, DAY_ORDER, exercise_from_entry, write_json_atomic, load_roster_schedules
+from schedule_lock import schedule_file_lock
+
+# History of every member's weekly schedules, for coaches' trend analysis. Snapshots are taken once a week,
+# and also before a schedule is reset or re-created, so no week is lost.
+# Storage is columnar: each member has a folder with one archive file per year plus a sidecar "index.json".
+# A snapshot belongs to the year its week starts in, so a week spanning New Year is kept in one place.
+# An archive file holds one zlib-compressed block per column, and the index records where each block is.
+# A query therefore only opens the members and years it needs, and only decompresses the columns it reads.
+# For example, counting an exercise reads just the week, exercise and name columns.
+# Day, muscle, exercise, intensity and reason names are dictionary-encoded: the "names" column lists each
+# distinct name once, and the other columns store positions in that list.
+HISTORY_FOLDER = "history"
+DEFAULT_MEMBER = "local"  # Member name used by the single-user apps (V5 and terminal_app.py)
+
+# Columns of the three tables stored in each year's archive (every column is a list of integers)
+SNAPSHOT_COLUMNS = ["snapshot_week", "snapshot_time", "snapshot_reason", "snapshot_days"]
+MUSCLE_COLUMNS = ["muscle_snapshot", "muscle_day", "muscle_name"]
+EXERCISE_COLUMNS = ["exercise_snapshot", "exercise_day", "exercise_muscle", "exercise_name",
+                    "exercise_focus", "exercise_sets", "exercise_reps"]
+
+def week_start(when):
+    # Monday of the week containing a date or datetime
+    when_date = when.date() if isinstance(when, datetime.datetime) else when
+    return when_date - datetime.timedelta(days=when_date.weekday())
+
+def member_folder(member_name, history_folder=HISTORY_FOLDER):
+    return os.path.join(history_folder, member_name)
+
+def load_index(member_name, history_folder=HISTORY_FOLDER):
+    # The member's sidecar index: {year: {"first_week", "last_week", "last_weekly_week", "snapshots",
+    #                                     "columns": {column name: [offset, length]}}}
+    try:
+        with open(os.path.join(member_folder(member_name, history_folder), "index.json"), "r") as index_file:
+            return json.load(index_file)
+    except FileNotFoundError:
+        return {}
+
+def read_columns(member_name, year_text, year_entry, column_names, history_folder=HISTORY_FOLDER):
+    # Reads and decompresses only the requested columns of one year's archive
+    columns = {}
+    with open(os.path.join(member_folder(member_name, history_folder), f"{year_text}.archive"), "rb") as archive_file:
+        for column_name in column_names:
+            offset, length = year_entry["columns"][column_name]
+            archive_file.seek(offset)
+            column_bytes = zlib.decompress(archive_file.read(length))
+            if column_name == "names":
+                columns[column_name] = column_bytes.decode("utf-8").split("\n") if column_bytes else []
+            else:
+                columns[column_name] = array("q", column_bytes)
+    return columns
+
+def write_year(member_name, year_text, columns, history_folder=HISTORY_FOLDER):
+    # Compresses every column into the year's archive file (swapped in whole) and returns its index entry
+    folder_path = member_folder(member_name, history_folder)
+    archive_path = os.path.join(folder_path, f"{year_text}.archive")
+    column_offsets = {}
+    archive_bytes = bytearray()
+    for column_name, values in columns.items():
+        raw_bytes = "\n".join(values).encode("utf-8") if column_name == "names" else array("q", values).tobytes()
+        compressed_bytes = zlib.compress(raw_bytes, 9)
+        column_offsets[column_name] = [len(archive_bytes), len(compressed_bytes)]
+        archive_bytes += compressed_bytes
+    temporary_path = archive_path + ".tmp"
+    with open(temporary_path, "wb") as archive_file:
+        archive_file.write(archive_bytes)
+        archive_file.flush()
+        os.fsync(archive_file.fileno())
+    os.replace(temporary_path, archive_path)
+    week_ordinals = columns["snapshot_week"]
+    return {
+        "first_week": datetime.date.fromordinal(min(week_ordinals)).isoformat(),
+        "last_week": datetime.date.fromordinal(max(week_ordinals)).isoformat(),
+        "snapshots": len(week_ordinals),
+        "columns": column_offsets
+    }
+
+def snapshot_schedule(schedule_data, member_name=DEFAULT_MEMBER, reason="weekly", when=None,
+                      history_folder=HISTORY_FOLDER):
+    # Adds one snapshot of a schedule to the member's archive for the year its week starts in
+    when = when or datetime.datetime.now()
+    year_text = str(week_start(when).year)
+    folder_path = member_folder(member_name, history_folder)
+    os.makedirs(folder_path, exist_ok=True)
+    index_path = os.path.join(folder_path, "index.json")
+    with schedule_file_lock(index_path):  # One writer per member at a time
+        member_index = load_index(member_name, history_folder)
+        if year_text in member_index:
+            columns = read_columns(member_name, year_text, member_index[year_text],
+                                   ["names"] + SNAPSHOT_COLUMNS + MUSCLE_COLUMNS + EXERCISE_COLUMNS, history_folder)
+            columns = {column_name: list(values) for column_name, values in columns.items()}
+        else:
+            columns = {column_name: [] for column_name in ["names"] + SNAPSHOT_COLUMNS + MUSCLE_COLUMNS +
+                       EXERCISE_COLUMNS}
+        name_ids = {name: name_id for name_id, name in enumerate(columns["names"])}
+
+        def name_id_for(name):
+            # Position of a name in the dictionary, adding it the first time it is seen
+            if name not in name_ids:
+                name_ids[name] = len(columns["names"])
+                columns["names"].append(name)
+            return name_ids[name]
+
+        snapshot_row = len(columns["snapshot_week"])
+        workout_days = 0
+        for day_entry in schedule_data.get("workout_schedule", []):
+            if day_entry.get("rest", True):
+                continue
+            if day_entry.get("name") in DAY_ORDER:
+                workout_days |= 1 << DAY_ORDER.index(day_entry["name"])
+            day_id = name_id_for(day_entry.get("name", ""))
+            for muscle_name in day_entry.get("workout_purpose", []):
+                columns["muscle_snapshot"].append(snapshot_row)
+                columns["muscle_day"].append(day_id)
+                columns["muscle_name"].append(name_id_for(muscle_name))
+            for exercise_entry in day_entry.get("exercises", []):
+                exercise_obj = exercise_from_entry(exercise_entry)
+                columns["exercise_snapshot"].append(snapshot_row)
+                columns["exercise_day"].append(day_id)
+                columns["exercise_muscle"].append(name_id_for(exercise_obj.muscle_group))
+                columns["exercise_name"].append(name_id_for(exercise_obj.exercise_name))
+                columns["exercise_focus"].append(name_id_for(exercise_obj.focus_type))
+                columns["exercise_sets"].append(exercise_obj.sets)
+                columns["exercise_reps"].append(exercise_obj.reps)
+        columns["snapshot_week"].append(week_start(when).toordinal())
+        columns["snapshot_time"].append(int(when.timestamp()))
+        columns["snapshot_reason"].append(name_id_for(reason))
+        columns["snapshot_days"].append(workout_days)
+
+        last_weekly_week = member_index.get(year_text, {}).get("last_weekly_week")
+        member_index[year_text] = write_year(member_name, year_text, columns, history_folder)
+        if reason == "weekly":
+            last_weekly_week = week_start(when).isoformat()
+        member_index[year_text]["last_weekly_week"] = last_weekly_week
+        write_json_atomic(member_index, index_path)
+
+def snapshot_week_if_needed(schedule_data, member_name=DEFAULT_MEMBER, when=None, history_folder=HISTORY_FOLDER):
+    # Takes this week's "weekly" snapshot unless one already exists; only reads the index otherwise
+    when = when or datetime.datetime.now()
+    year_entry = load_index(member_name, history_folder).get(str(week_start(when).year), {})
+    if (year_entry.get("last_weekly_week") or "") >= week_start(when).isoformat():
+        return False
+    snapshot_schedule(schedule_data, member_name, "weekly", when, history_folder)
+    return True
+
+def archive_previous_schedule(schedule_data, reason, member_name=DEFAULT_MEMBER, history_folder=HISTORY_FOLDER):
+    # Snapshots a schedule that is about to be reset or re-created (blank schedules are not worth keeping)
+    if any(not day_entry.get("rest", True) for day_entry in schedule_data.get("workout_schedule", [])):
+        snapshot_schedule(schedule_data, member_name, reason, history_folder=history_folder)
+
+def years_in_range(member_index, start_date, end_date):
+    # Years of a member's index whose weeks overlap [start_date, end_date]
+    for year_text, year_entry in sorted(member_index.items()):
+        if year_entry["last_week"] >= week_start(start_date).isoformat() and \
+                year_entry["first_week"] <= end_date.isoformat():
+            yield year_text, year_entry
+
+def member_snapshots(member_name, start_date=datetime.date.min, end_date=datetime.date.max,
+                     history_folder=HISTORY_FOLDER):
+    # Yields every snapshot of a member taken in weeks overlapping [start_date, end_date], oldest first,
+    # as {"week", "taken_at", "reason", "schedule"} with the schedule rebuilt in the saved format
+    member_index = load_index(member_name, history_folder)
+    for year_text, year_entry in years_in_range(member_index, start_date, end_date):
+        columns = read_columns(member_name, year_text, year_entry,
+                               ["names"] + SNAPSHOT_COLUMNS + MUSCLE_COLUMNS + EXERCISE_COLUMNS, history_folder)
+        names = columns["names"]
+        snapshot_days = {}  # (snapshot row, day name) -> day entry
+        for snapshot_row, day_id, muscle_id in zip(*(columns[name] for name in MUSCLE_COLUMNS)):
+            day_entry = snapshot_days.setdefault((snapshot_row, names[day_id]),
+                                                 {"workout_purpose": [], "exercises": []})
+            day_entry["workout_purpose"].append(names[muscle_id])
+        for snapshot_row, day_id, muscle_id, name_id, focus_id, sets, reps in \
+                zip(*(columns[name] for name in EXERCISE_COLUMNS)):
+            day_entry = snapshot_days.setdefault((snapshot_row, names[day_id]),
+                                                 {"workout_purpose": [], "exercises": []})
+            day_entry["exercises"].append({"name": names[name_id], "muscle": names[muscle_id],
+                                           "focus_type": names[focus_id], "sets": sets, "reps": reps})
+
+        for snapshot_row, (week_ordinal, taken_at, reason_id, workout_days) in \
+                enumerate(zip(*(columns[name] for name in SNAPSHOT_COLUMNS))):
+            week_date = datetime.date.fromordinal(week_ordinal)
+            if not week_start(start_date) <= week_date <= end_date:
+                continue
+            schedule_data = {"format": SCHEDULE_FORMAT, "workout_schedule": []}
+            for day_index, day_name in enumerate(DAY_ORDER):
+                is_rest_day = not workout_days >> day_index & 1
+                day_entry = snapshot_days.get((snapshot_row, day_name), {"workout_purpose": [], "exercises": []})
+                schedule_data["workout_schedule"].append({"name": day_name, "rest": is_rest_day, **day_entry})
+            yield {"week": week_date.isoformat(), "taken_at": taken_at, "reason": names[reason_id],
+                   "schedule": schedule_data}
+
+def archived_members(history_folder=HISTORY_FOLDER):
+    # Names of every member with an archive
+    if not os.path.isdir(history_folder):
+        return []
+    return sorted(folder_name for folder_name in os.listdir(history_folder)
+                  if os.path.isfile(os.path.join(history_folder, folder_name, "index.json")))
+
+def exercise_counts(member_names=None, start_date=datetime.date.min, end_date=datetime.date.max,
+                    history_folder=HISTORY_FOLDER):
+    # How many times each exercise was programmed (one count per snapshot and day) across members and weeks.
+    # Only the snapshot week, exercise snapshot/name and names columns are decompressed.
+    counts = {}
+    for member_name in member_names or archived_members(history_folder):
+        member_index = load_index(member_name, history_folder)
+        for year_text, year_entry in years_in_range(member_index, start_date, end_date):
+            columns = read_columns(member_name, year_text, year_entry,
+                                   ["names", "snapshot_week", "exercise_snapshot", "exercise_name"], history_folder)
+            week_ordinals = columns["snapshot_week"]
+            first_ordinal, last_ordinal = week_start(start_date).toordinal(), end_date.toordinal()
+            for snapshot_row, name_id in zip(columns["exercise_snapshot"], columns["exercise_name"]):
+                if first_ordinal <= week_ordinals[snapshot_row] <= last_ordinal:
+                    exercise_name = columns["names"][name_id]
+                    counts[exercise_name] = counts.get(exercise_name, 0) + 1
+    return counts
+
+def main(argument_list=None):
+    parser = argparse.ArgumentParser(description="Archive weekly schedules and query members' history.")
+    parser.add_argument("--history", default=HISTORY_FOLDER, help="history archive folder")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    snapshot_parser = subparsers.add_parser("snapshot", help="archive this week's schedule for every member")
+    snapshot_parser.add_argument("roster_folder", help="folder of <member>.json schedule files")
+    weeks_parser = subparsers.add_parser("weeks", help="print a member's archived weeks")
+    weeks_parser.add_argument("member")
+    weeks_parser.add_argument("--year", type=int, default=None)
+    count_parser = subparsers.add_parser("count", help="count how often exercises were programmed")
+    count_parser.add_argument("--exercise", default=None, help="only print this exercise")
+    count_parser.add_argument("--member", action="append", default=None, help="limit to a member (repeatable)")
+    count_parser.add_argument("--year", type=int, default=None)
+    arguments = parser.parse_args(argument_list)
+
+    start_date, end_date = datetime.date.min, datetime.date.max
+    if getattr(arguments, "year", None):
+        start_date, end_date = datetime.date(arguments.year, 1, 1), datetime.date(arguments.year, 12, 31)
+
+    if arguments.command == "snapshot":
+        snapshot_count = 0
+        for member_name, schedule_data in load_roster_schedules(arguments.roster_folder).items():
+            snapshot_count += snapshot_week_if_needed(schedule_data, member_name, history_folder=arguments.history)
+        print(f"Archived {snapshot_count} schedule(s).", file=sys.stderr)
+    elif arguments.command == "weeks":
+        for snapshot in member_snapshots(arguments.member, start_date, end_date, arguments.history):
+            sys.stdout.write(json.dumps(snapshot) + "\n")
+    else:
+        counts = exercise_counts(arguments.member, start_date, end_date, arguments.history)
+        for exercise_name, count in sorted(counts.items(), key=lambda item: -item[1]):
+            if arguments.exercise is None or exercise_name == arguments.exercise:
+                sys.stdout.write(json.dumps({"exercise": exercise_name, "count": count}) + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import sys
+import json
+import argparse
+
+import numpy as np
+
+from fitness_data import get_intensity_profiles, get_default_intensity, exercise_from_entry, load_roster_schedules
+
+# Batched load prescription: turns schedules plus each member's 1RM table into concrete target loads.
+# Every exercise of every member is gathered into flat arrays first, so the loads for a whole roster
+# (e.g. after a testing week) are worked out in one NumPy pass instead of one object at a time.
+PLATE_INCREMENT = 2.5  # Loads are rounded to the nearest plate increment (kg)
+
+def collect_roster_exercises(roster_schedules):
+    # Flattens {member: schedule_data} into parallel lists of (member, day, exercise object)
+    exercise_rows = []
+    for member_name, schedule_data in roster_schedules.items():
+        for day_entry in schedule_data.get("workout_schedule", []):
+            if day_entry.get("rest", True):
+                continue
+            for exercise_info in day_entry.get("exercises", []):
+                exercise_rows.append((member_name, day_entry["name"], exercise_from_entry(exercise_info)))
+    return exercise_rows
+
+def prescribe_roster_loads(roster_schedules, roster_one_rep_maxes, plate_increment=PLATE_INCREMENT):
+    # Returns one prescription dictionary per scheduled exercise across all members.
+    # roster_one_rep_maxes is {member: {exercise name: 1RM}}; exercises without a 1RM get a load of None.
+    exercise_rows = collect_roster_exercises(roster_schedules)
+    if not exercise_rows:
+        return []
+
+    profiles = get_intensity_profiles()
+    profile_names = list(profiles)
+    percent_table = np.array([profiles[name]["percent_one_rep_max"] for name in profile_names])
+    default_index = profile_names.index(get_default_intensity())
+
+    # 1RM lookups are gathered into one array (NaN where the member has not tested that lift)
+    one_rep_max_array = np.array([
+        roster_one_rep_maxes.get(member_name, {}).get(exercise_obj.exercise_name, np.nan)
+        for member_name, _, exercise_obj in exercise_rows
+    ], dtype=float)
+    profile_index_array = np.array([
+        profile_names.index(exercise_obj.focus_type) if exercise_obj.focus_type in profiles else default_index
+        for _, _, exercise_obj in exercise_rows
+    ])
+
+    # The whole roster's loads in one vectorised step
+    target_loads = np.round(one_rep_max_array * percent_table[profile_index_array] / plate_increment) * plate_increment
+
+    prescriptions = []
+    for (member_name, day_name, exercise_obj), target_load in zip(exercise_rows, target_loads.tolist()):
+        prescriptions.append({
+            "member": member_name,
+            "day": day_name,
+            "exercise": exercise_obj.exercise_name,
+            "focus_type": exercise_obj.focus_type,
+            "sets": exercise_obj.sets,
+            "reps": exercise_obj.reps,
+            "rpe": exercise_obj.rpe,
+            "rest_seconds": exercise_obj.rest_seconds,
+            "target_load": None if target_load != target_load else target_load  # NaN -> None (no 1RM yet)
+        })
+    return prescriptions
+
+def prescribe_loads(schedule_data, one_rep_maxes, plate_increment=PLATE_INCREMENT):
+    # Single-member version of prescribe_roster_loads
+    return prescribe_roster_loads({"member": schedule_data}, {"member": one_rep_maxes}, plate_increment)
+
+def main(argument_list=None):
+    parser = argparse.ArgumentParser(description="Work out target loads for every member's schedule.")
+    parser.add_argument("roster_folder", help="folder of <member>.json schedule files")
+    parser.add_argument("one_rep_max_file", help='JSON file of {"member": {"exercise": 1RM}}')
+    parser.add_argument("--plate-increment", type=float, default=PLATE_INCREMENT)
+    arguments = parser.parse_args(argument_list)
+
+    with open(arguments.one_rep_max_file, "r") as one_rep_max_file:
+        roster_one_rep_maxes = json.load(one_rep_max_file)
+    prescriptions = prescribe_roster_loads(load_roster_schedules(arguments.roster_folder),
+                                           roster_one_rep_maxes, arguments.plate_increment)
+    for prescription in prescriptions:
+        sys.stdout.write(json.dumps(prescription) + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
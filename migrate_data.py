@@ -0,0 +1,197 @@
+import os
+import sys
+import json
+import argparse
+from itertools import islice
+
+from fitness_data import (CATALOG_FILE, SCHEDULE_FORMAT, DAY_ORDER, get_intensity_profiles, write_schedule,
+                          write_json_atomic, split_exercise_info, exercise_from_entry, find_muscle_for_exercise)
+from schedule_rules import day_entry_problem
+from catalog_workers import worker_exercise_data, init_worker, find_json_files
+
+# Migration tool for old data files. Detects what each file is and upgrades it to the current format:
+#   - V2 catalog halves ("V2exercises.json" + "V2muscle_groups.json") -> one combined catalog file
+#     ("V2bothEandM.json", same layout as V3-5bothEandM.json)
+#   - V3-V5 schedules with rendered exercise strings, and schedules saved from a week_day_list whose
+#     workout days had no muscle element -> a format 2 schedule with exercise dictionaries
+# Already-migrated files are skipped, so the tool can be re-run safely. Files with entries of the wrong type
+# (e.g. hand-edited), with intensities that aren't in intensity_profiles.json, or that fail for any other reason
+# are reported as "failed" and left untouched. Large archives are processed in
+# fixed-size batches across worker processes, so memory use stays bounded however many files there are.
+# Note: the V3 and V4 scripts can't read format 2 schedules (they join the exercise entries as strings), so
+# only migrate schedules that are no longer opened with V3 or V4. V5 and the newer tools read both formats.
+BATCH_SIZE = 5000  # Files queued to the worker pool at a time
+
+def detect_file_version(file_data):
+    # Works out what kind of data file this is from its contents
+    if not isinstance(file_data, dict):
+        return "unknown"
+    if "workout_schedule" in file_data:
+        if file_data.get("format") == SCHEDULE_FORMAT:
+            return "schedule-current"
+        return "schedule-v3-5"
+    if "exercises" in file_data and "muscle_groups" in file_data:
+        return "catalog-current"
+    if "exercises" in file_data:
+        return "catalog-v2-exercises"
+    if "muscle_groups" in file_data:
+        return "catalog-v2-muscle-groups"
+    return "unknown"
+
+def saved_focus_type(exercise_entry):
+    # The intensity a saved exercise names (None if it names none and gets the default)
+    if isinstance(exercise_entry, dict):
+        return exercise_entry.get("focus_type")
+    return split_exercise_info(exercise_entry)[1]
+
+def unreadable_entry(schedule_data):
+    # The first entry upgrade_schedule can't safely read (wrong types in a hand-edited file, or an intensity
+    # it would have to replace with the default one), or None
+    day_entries = schedule_data.get("workout_schedule")
+    if not isinstance(day_entries, list):
+        return "'workout_schedule' must be a list."
+    for day_entry in day_entries:
+        if not isinstance(day_entry, dict):
+            return f"Day entry {day_entry!r} is not an object."
+        entry_problem = day_entry_problem(day_entry)
+        if entry_problem:
+            return f"{day_entry.get('name')!r}: {entry_problem}"
+        for exercise_entry in day_entry.get("exercises", []):
+            if not isinstance(exercise_entry, str) and not (isinstance(exercise_entry, dict)
+                                                            and isinstance(exercise_entry.get("name"), str)):
+                return f"{day_entry.get('name')!r}: unreadable exercise entry {exercise_entry!r}."
+            focus_type = saved_focus_type(exercise_entry)
+            if focus_type is not None and not (isinstance(focus_type, str) and focus_type in get_intensity_profiles()):
+                return f"{day_entry.get('name')!r}: unknown intensity {focus_type!r} in {exercise_entry!r}."
+    return None
+
+def upgrade_schedule(schedule_data, exercise_data):
+    # Returns a format 2 copy of an older schedule (or the schedule itself if it is already current)
+    if schedule_data.get("format") == SCHEDULE_FORMAT:
+        return schedule_data
+    saved_days = {day_entry.get("name"): day_entry for day_entry in schedule_data.get("workout_schedule", [])
+                  if isinstance(day_entry, dict)}
+    upgraded_schedule = {key: value for key, value in schedule_data.items() if key != "workout_schedule"}
+    upgraded_schedule["format"] = SCHEDULE_FORMAT
+    upgraded_schedule["workout_schedule"] = []
+
+    for day_name in DAY_ORDER:  # Days missing from the old file become rest days
+        old_day = saved_days.get(day_name, {})
+        is_rest_day = old_day.get("rest", True)
+        muscle_list = list(old_day.get("workout_purpose") or [])
+        exercise_objects = [exercise_from_entry(exercise_entry) for exercise_entry in old_day.get("exercises", [])]
+
+        # Truncated saves have no muscles: work them out from the day's exercises where possible
+        if not is_rest_day and not muscle_list:
+            for exercise_obj in exercise_objects:
+                muscle_name = find_muscle_for_exercise(exercise_obj.exercise_name, list(exercise_data),
+                                                       exercise_data)
+                if muscle_name and muscle_name not in muscle_list:
+                    muscle_list.append(muscle_name)
+
+        exercise_entries = []
+        if not is_rest_day:
+            for exercise_obj in exercise_objects:
+                exercise_obj.muscle_group = find_muscle_for_exercise(exercise_obj.exercise_name, muscle_list,
+                                                                     exercise_data)
+                exercise_entries.append(exercise_obj.to_entry())
+        upgraded_schedule["workout_schedule"].append({
+            "name": day_name,
+            "rest": is_rest_day,
+            "workout_purpose": [] if is_rest_day else muscle_list,
+            "exercises": exercise_entries
+        })
+    return upgraded_schedule
+
+def combined_catalog_path(exercises_path):
+    # "V2exercises.json" -> "V2bothEandM.json" (next to the original file)
+    folder_path, file_name = os.path.split(exercises_path)
+    return os.path.join(folder_path, file_name.replace("exercises", "bothEandM"))
+
+def migrate_file(file_path, dry_run=False):
+    # Migrates one file and returns a report dictionary describing what was done
+    try:
+        return migrate_one_file(file_path, dry_run)
+    except Exception as error:  # One odd file must not stop the whole run
+        return {"file": file_path, "action": "failed", "message": f"Could not migrate file: {error!r}"}
+
+def migrate_one_file(file_path, dry_run):
+    # The migration itself; any error it raises is reported by migrate_file
+    report = {"file": file_path}
+    try:
+        with open(file_path, "r") as data_file:
+            file_data = json.load(data_file)
+    except (OSError, ValueError) as error:
+        report.update(detected="unreadable", action="skipped", message=str(error))
+        return report
+    detected_version = detect_file_version(file_data)
+    report["detected"] = detected_version
+
+    if detected_version == "schedule-v3-5":
+        entry_problem = unreadable_entry(file_data)
+        if entry_problem:  # Checked before upgrading, so a bad file is never rewritten
+            report.update(action="failed", message=f"Unreadable entry: {entry_problem}")
+            return report
+        try:
+            upgraded_schedule = upgrade_schedule(file_data, worker_exercise_data)
+        except (KeyError, TypeError, AttributeError) as error:  # Hand-edited entries we can't make sense of
+            report.update(action="failed", message=f"Unreadable entry: {error!r}")
+            return report
+        if not dry_run:
+            write_schedule(upgraded_schedule, file_path)
+        report["action"] = "migrated"
+    elif detected_version == "catalog-v2-exercises":
+        # Combine with the matching muscle groups file, e.g. V2exercises.json + V2muscle_groups.json
+        muscle_groups_path = os.path.join(os.path.dirname(file_path),
+                                          os.path.basename(file_path).replace("exercises", "muscle_groups"))
+        output_path = combined_catalog_path(file_path)
+        if os.path.exists(output_path):
+            report["action"] = "already migrated"
+        elif muscle_groups_path == file_path or not os.path.exists(muscle_groups_path):
+            report.update(action="skipped", message="No matching muscle groups file found.")
+        else:
+            with open(muscle_groups_path, "r") as muscle_groups_file:
+                muscle_group_data = json.load(muscle_groups_file).get("muscle_groups", {})
+            if not dry_run:
+                write_json_atomic({"exercises": file_data["exercises"], "muscle_groups": muscle_group_data},
+                                  output_path)
+            report.update(action="migrated", output=output_path)
+    elif detected_version == "catalog-v2-muscle-groups":
+        report["action"] = "merged with exercises file"
+    elif detected_version in ("schedule-current", "catalog-current"):
+        report["action"] = "already migrated"
+    else:
+        report["action"] = "skipped"
+    return report
+
+def migrate_dry_run(file_path):
+    # Module-level wrapper so the worker pool can pickle it
+    return migrate_file(file_path, dry_run=True)
+
+def main(argument_list=None):
+    parser = argparse.ArgumentParser(description="Upgrade old V2-V5 data files to the current format.")
+    parser.add_argument("folder", help="folder to scan recursively for .json files")
+    parser.add_argument("--catalog", default=CATALOG_FILE, help="exercise catalog used to fill in muscles")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    arguments = parser.parse_args(argument_list)
+    from multiprocessing import Pool  # Only the command-line tool needs it (the apps import upgrade_schedule)
+
+    migrate_function = migrate_dry_run if arguments.dry_run else migrate_file
+    action_counts = {}
+    data_files = find_json_files(arguments.folder)
+    with Pool(arguments.processes, initializer=init_worker, initargs=(arguments.catalog,)) as worker_pool:
+        while True:
+            file_batch = list(islice(data_files, BATCH_SIZE))
+            if not file_batch:
+                break
+            for report in worker_pool.imap_unordered(migrate_function, file_batch, chunksize=64):
+                action_counts[report["action"]] = action_counts.get(report["action"], 0) + 1
+                sys.stdout.write(json.dumps(report) + "\n")
+
+    summary = ", ".join(f"{count} {action}" for action, count in sorted(action_counts.items()))
+    print(f"Done: {summary or 'no files found'}.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
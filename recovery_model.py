@@ -0,0 +1,116 @@
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+from fitness_data import (CATALOG_FILE, DAY_ORDER, load_catalog, get_intensity_profiles, get_default_intensity,
+                          exercise_from_entry, find_muscle_for_exercise, exercise_sub_muscles,
+                          load_roster_schedules)
+
+# Fatigue and recovery model per sub-muscle (e.g. "Chest: upper chest"), used to warn when a planned
+# session lands on a sub-muscle that has not recovered yet. Every set adds fatigue to the sub-muscles the
+# exercise trains (scaled by the intensity's "fatigue_per_set" in intensity_profiles.json), and fatigue
+# halves every RECOVERY_HALF_LIFE_DAYS. Whole rosters are simulated at once: each simulated day is one
+# NumPy step over a (members, sub-muscles) array.
+RECOVERY_HALF_LIFE_DAYS = 1.0     # Fatigue halves every day...
+UNDER_RECOVERED_THRESHOLD = 2.0   # ...and a session on a sub-muscle carrying more than this gets a warning
+DEFAULT_MUSCLE_SETS = 8           # Sets assumed for a muscle that has been planned but has no exercises yet
+WARM_UP_WEEKS = 1                 # Weeks simulated first so Monday includes fatigue from the previous Sunday
+
+def sub_muscle_index(muscle_group_data):
+    # Lists every (muscle, sub-muscle) pair and maps each to its column in the fatigue arrays
+    sub_muscle_pairs = [(muscle_name, sub_muscle) for muscle_name, sub_muscles in muscle_group_data.items()
+                        for sub_muscle in sub_muscles]
+    return sub_muscle_pairs, {pair: column for column, pair in enumerate(sub_muscle_pairs)}
+
+def week_load(schedule_data, exercise_data, muscle_group_data, column_lookup):
+    # Fatigue added on each day of the week, as a (7, sub-muscles) array
+    profiles = get_intensity_profiles()
+    default_fatigue = profiles[get_default_intensity()]["fatigue_per_set"]
+    load_array = np.zeros((len(DAY_ORDER), len(column_lookup)))
+    for day_entry in schedule_data.get("workout_schedule", []):
+        if day_entry.get("rest", True) or day_entry.get("name") not in DAY_ORDER:
+            continue
+        day_index = DAY_ORDER.index(day_entry["name"])
+        day_muscles = day_entry.get("workout_purpose", [])
+        trained_muscles = set()
+        for exercise_entry in day_entry.get("exercises", []):
+            exercise_obj = exercise_from_entry(exercise_entry)
+            muscle_name = exercise_obj.muscle_group or find_muscle_for_exercise(exercise_obj.exercise_name,
+                                                                                day_muscles, exercise_data)
+            fatigue_per_set = profiles.get(exercise_obj.focus_type, {}).get("fatigue_per_set", default_fatigue)
+            for sub_muscle in exercise_sub_muscles(exercise_obj.exercise_name, muscle_name, muscle_group_data):
+                load_array[day_index, column_lookup[(muscle_name, sub_muscle)]] += exercise_obj.sets * fatigue_per_set
+            trained_muscles.add(muscle_name)
+        # Muscles chosen for the day but with no exercises picked yet get a typical session's load
+        for muscle_name in day_muscles:
+            if muscle_name not in trained_muscles:
+                for sub_muscle in muscle_group_data.get(muscle_name, []):
+                    load_array[day_index, column_lookup[(muscle_name, sub_muscle)]] += DEFAULT_MUSCLE_SETS * default_fatigue
+    return load_array
+
+def under_recovered_counts(week_loads, weeks=52, half_life_days=RECOVERY_HALF_LIFE_DAYS,
+                           threshold=UNDER_RECOVERED_THRESHOLD):
+    # Simulates fatigue for every member over a repeated weekly plan. week_loads has shape
+    # (members, 7, sub-muscles); returns how many times each (member, weekday, sub-muscle) session started
+    # under-recovered. Only the current day's fatigue is kept, so memory does not grow with the timeline.
+    decay = 0.5 ** (1.0 / half_life_days)
+    fatigue = np.zeros((week_loads.shape[0], week_loads.shape[2]))
+    flagged_counts = np.zeros(week_loads.shape, dtype=np.int32)
+    trained_days = week_loads > 0
+    for week_number in range(WARM_UP_WEEKS + weeks):
+        for day_index in range(len(DAY_ORDER)):
+            fatigue *= decay
+            if week_number >= WARM_UP_WEEKS:
+                flagged_counts[:, day_index] += trained_days[:, day_index] & (fatigue > threshold)
+            fatigue += week_loads[:, day_index]
+    return flagged_counts
+
+def recovery_warnings(schedule_data, exercise_data, muscle_group_data):
+    # Readable warnings for one schedule, e.g. for the GUI while the user is still editing it
+    sub_muscle_pairs, column_lookup = sub_muscle_index(muscle_group_data)
+    week_loads = week_load(schedule_data, exercise_data, muscle_group_data, column_lookup)[np.newaxis]
+    flagged = under_recovered_counts(week_loads, weeks=1)[0] > 0
+
+    warnings = []
+    for day_index, day_name in enumerate(DAY_ORDER):
+        tired_sub_muscles = {}
+        for column in np.flatnonzero(flagged[day_index]):
+            muscle_name, sub_muscle = sub_muscle_pairs[column]
+            tired_sub_muscles.setdefault(muscle_name, []).append(sub_muscle)
+        for muscle_name, sub_muscles in tired_sub_muscles.items():
+            warnings.append(f"{day_name}: {muscle_name} ({', '.join(sub_muscles)}) "
+                            f"has not recovered from earlier sessions.")
+    return warnings
+
+def simulate_roster(roster_schedules, exercise_data, muscle_group_data, weeks=52):
+    # Simulates every member at once; returns {member: number of under-recovered sub-muscle sessions}
+    _, column_lookup = sub_muscle_index(muscle_group_data)
+    member_names = list(roster_schedules)
+    week_loads = np.stack([week_load(roster_schedules[member_name], exercise_data, muscle_group_data, column_lookup)
+                           for member_name in member_names]) if member_names else np.zeros((0, 7, len(column_lookup)))
+    flagged_counts = under_recovered_counts(week_loads, weeks).sum(axis=(1, 2))
+    return dict(zip(member_names, flagged_counts.tolist()))
+
+def main(argument_list=None):
+    parser = argparse.ArgumentParser(description="Simulate sub-muscle fatigue for every member's schedule.")
+    parser.add_argument("roster_folder", help="folder of <member>.json schedule files")
+    parser.add_argument("--catalog", default=CATALOG_FILE)
+    parser.add_argument("--weeks", type=int, default=52)
+    arguments = parser.parse_args(argument_list)
+
+    exercise_data, muscle_group_data = load_catalog(arguments.catalog)
+    roster_schedules = load_roster_schedules(arguments.roster_folder)
+
+    started = time.perf_counter()
+    flagged_counts = simulate_roster(roster_schedules, exercise_data, muscle_group_data, arguments.weeks)
+    elapsed = time.perf_counter() - started
+    for member_name, flagged_count in flagged_counts.items():
+        sys.stdout.write(json.dumps({"member": member_name, "under_recovered_sessions": flagged_count}) + "\n")
+    print(f"Simulated {len(flagged_counts)} member(s) for {arguments.weeks} weeks in {elapsed:.2f}s.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import argparse
+
+from fitness_data import (CATALOG_FILE, DAY_ORDER, load_catalog, load_exercise_details, exercise_from_entry,
+                          make_exercise, find_muscle_for_exercise, exercise_equipment, load_roster_schedules)
+from migrate_data import upgrade_schedule
+from schedule_lock import save_schedule_checked
+from schedule_rules import day_selection_problem, muscle_assignment_problems
+from session_builder import exercise_minutes
+
+# Roster-level planner that spreads equipment use across the week. Each exercise's equipment comes from
+# "exercise_details" in the catalog. Demand is measured in station-minutes: the exercise's estimated length
+# (see session_builder.exercise_minutes) for each piece of equipment it needs, on each day it is planned.
+# Load is demand divided by the number of stations the gym has. The planner proposes two kinds of change:
+#   - moving a member's workout day to one of their rest days
+#   - swapping an exercise for another one for the same muscle
+# Every proposal is checked with the same schedule_rules checks as create_schedule.
+# Proposals are scored by how much they lower the sum of squared loads, which flattens peaks.
+# Totals are kept per member, so adding, changing or removing one member only updates that member's share.
+# With --apply, changed member files are saved like the apps save them (locked, versioned, and merged with any
+# save made since the planner read them), so an app holding one of those files sees its copy as stale.
+
+def copy_schedule(schedule_data):
+    return json.loads(json.dumps(schedule_data))
+
+def schedule_problem(schedule_data):
+    # First rule a schedule breaks (same checks as the create_schedule wizard), or None if it is valid
+    muscles_by_day = {day_entry["name"]: day_entry["workout_purpose"]
+                      for day_entry in schedule_data["workout_schedule"] if not day_entry["rest"]}
+    selected_days = list(muscles_by_day)
+    day_problem = day_selection_problem(selected_days)
+    if day_problem:
+        return day_problem
+    first_problem = next(muscle_assignment_problems(selected_days, muscles_by_day), None)
+    return first_problem and first_problem[2]
+
+class RosterPlanner:
+    # Holds every member's schedule and their share of the equipment demand
+    def __init__(self, exercise_data, exercise_details, stations=None):
+        self.exercise_data = exercise_data
+        self.exercise_details = exercise_details
+        self.stations = stations or {}  # Equipment name -> number of stations (1 if not listed)
+        self.member_schedules = {}
+        self.member_demand = {}  # Member -> {(equipment, day index): station-minutes}
+        self.total_demand = {}   # (equipment, day index) -> station-minutes across the roster
+
+    def equipment_for(self, exercise_name):
+        return exercise_equipment(exercise_name, self.exercise_details)
+
+    def schedule_demand(self, schedule_data):
+        # Station-minutes one schedule needs, per (equipment, day index)
+        demand = {}
+        for day_index, day_entry in enumerate(schedule_data["workout_schedule"]):
+            if day_entry["rest"] or day_entry["name"] not in DAY_ORDER:
+                continue
+            for exercise_entry in day_entry["exercises"]:
+                exercise_obj = exercise_from_entry(exercise_entry)
+                for equipment_name in self.equipment_for(exercise_obj.exercise_name):
+                    cell = (equipment_name, DAY_ORDER.index(day_entry["name"]))
+                    demand[cell] = demand.get(cell, 0) + exercise_minutes(exercise_obj)
+        return demand
+
+    def add_member(self, member_name, schedule_data, rebalance=True, max_moves=3):
+        # Adds (or replaces) one member; with rebalance, their own plan is then adjusted against everyone
+        # else's. Returns the proposals that were applied.
+        self.remove_member(member_name)
+        schedule_data = copy_schedule(upgrade_schedule(schedule_data, self.exercise_data))
+        self.member_schedules[member_name] = schedule_data
+        self.member_demand[member_name] = self.schedule_demand(schedule_data)
+        for cell, minutes in self.member_demand[member_name].items():
+            self.total_demand[cell] = self.total_demand.get(cell, 0) + minutes
+        return self.rebalance([member_name], max_moves) if rebalance else []
+
+    def remove_member(self, member_name):
+        for cell, minutes in self.member_demand.pop(member_name, {}).items():
+            self.total_demand[cell] -= minutes
+        self.member_schedules.pop(member_name, None)
+
+    def load(self, cell, minutes):
+        return minutes / self.stations.get(cell[0], 1)
+
+    def score_change(self, old_demand, new_demand):
+        # Change in the sum of squared loads if one member's demand went from old_demand to new_demand
+        score_change = 0.0
+        for cell in set(old_demand) | set(new_demand):
+            total_minutes = self.total_demand.get(cell, 0)
+            new_total = total_minutes - old_demand.get(cell, 0) + new_demand.get(cell, 0)
+            score_change += self.load(cell, new_total) ** 2 - self.load(cell, total_minutes) ** 2
+        return score_change
+
+    def candidate_changes(self, member_name):
+        # Yields (proposal, new schedule) for every single day move or exercise swap that keeps the plan valid
+        schedule_data = self.member_schedules[member_name]
+        day_entries = schedule_data["workout_schedule"]
+        for from_index, from_day in enumerate(day_entries):
+            if from_day["rest"]:
+                continue
+            for to_index, to_day in enumerate(day_entries):
+                if not to_day["rest"]:
+                    continue
+                new_schedule = copy_schedule(schedule_data)
+                new_days = new_schedule["workout_schedule"]
+                new_days[to_index].update(rest=False, workout_purpose=from_day["workout_purpose"],
+                                          exercises=from_day["exercises"])
+                new_days[from_index].update(rest=True, workout_purpose=[], exercises=[])
+                if schedule_problem(new_schedule) is None:
+                    yield {"kind": "move_day", "from_day": from_day["name"], "to_day": to_day["name"]}, new_schedule
+
+            for exercise_index, exercise_entry in enumerate(from_day["exercises"]):
+                exercise_obj = exercise_from_entry(exercise_entry)
+                muscle_name = exercise_obj.muscle_group or find_muscle_for_exercise(
+                    exercise_obj.exercise_name, from_day["workout_purpose"], self.exercise_data)
+                planned_names = {exercise_from_entry(entry).exercise_name for entry in from_day["exercises"]}
+                for replacement_name in self.exercise_data.get(muscle_name, []):
+                    if replacement_name in planned_names or \
+                            self.equipment_for(replacement_name) == self.equipment_for(exercise_obj.exercise_name):
+                        continue
+                    replacement = make_exercise(replacement_name, muscle_name, exercise_obj.focus_type)
+                    replacement.sets, replacement.reps = exercise_obj.sets, exercise_obj.reps
+                    new_schedule = copy_schedule(schedule_data)
+                    new_schedule["workout_schedule"][from_index]["exercises"][exercise_index] = replacement.to_entry()
+                    yield {"kind": "swap_exercise", "day": from_day["name"], "exercise": exercise_obj.exercise_name,
+                           "replacement": replacement_name}, new_schedule
+
+    def propose(self, member_name):
+        # Every valid change for one member that lowers the roster's peaks, best first
+        old_demand = self.member_demand[member_name]
+        proposals = []
+        for proposal, new_schedule in self.candidate_changes(member_name):
+            new_demand = self.schedule_demand(new_schedule)
+            improvement = -self.score_change(old_demand, new_demand)
+            if improvement > 1e-9:
+                proposals.append(({"member": member_name, **proposal, "improvement": round(improvement, 3)},
+                                  new_schedule, new_demand))
+        proposals.sort(key=lambda proposal: -proposal[0]["improvement"])
+        return proposals
+
+    def apply(self, member_name, new_schedule, new_demand):
+        for cell, minutes in self.member_demand[member_name].items():
+            self.total_demand[cell] -= minutes
+        for cell, minutes in new_demand.items():
+            self.total_demand[cell] = self.total_demand.get(cell, 0) + minutes
+        self.member_schedules[member_name] = new_schedule
+        self.member_demand[member_name] = new_demand
+
+    def rebalance(self, member_names=None, max_moves=3):
+        # Greedily applies each member's best proposal (up to max_moves each) and returns what was applied
+        applied_proposals = []
+        for member_name in member_names or list(self.member_schedules):
+            for _ in range(max_moves):
+                proposals = self.propose(member_name)
+                if not proposals:
+                    break
+                proposal, new_schedule, new_demand = proposals[0]
+                self.apply(member_name, new_schedule, new_demand)
+                applied_proposals.append(proposal)
+        return applied_proposals
+
+    def day_loads(self):
+        # {equipment: [load per weekday]}, where load is station-minutes per station
+        loads = {}
+        for (equipment_name, day_index), minutes in self.total_demand.items():
+            loads.setdefault(equipment_name, [0.0] * len(DAY_ORDER))[day_index] = \
+                round(self.load((equipment_name, day_index), minutes), 2)
+        return loads
+
+    def peak_load(self):
+        return max((max(day_loads) for day_loads in self.day_loads().values()), default=0.0)
+
+def main(argument_list=None):
+    parser = argparse.ArgumentParser(description="Spread the roster's equipment use across the week.")
+    parser.add_argument("roster_folder", help="folder of <member>.json schedule files")
+    parser.add_argument("--catalog", default=CATALOG_FILE)
+    parser.add_argument("--stations", default=None, help='JSON file of {"equipment": number of stations}')
+    parser.add_argument("--moves", type=int, default=3, help="most changes proposed per member")
+    parser.add_argument("--apply", action="store_true", help="write the changed schedules back to the roster")
+    arguments = parser.parse_args(argument_list)
+
+    exercise_data, _ = load_catalog(arguments.catalog)
+    stations = None
+    if arguments.stations:
+        with open(arguments.stations, "r") as stations_file:
+            stations = json.load(stations_file)
+    roster_planner = RosterPlanner(exercise_data, load_exercise_details(arguments.catalog), stations)
+    roster_schedules = load_roster_schedules(arguments.roster_folder)
+    for member_name, schedule_data in roster_schedules.items():
+        roster_planner.add_member(member_name, schedule_data, rebalance=False)
+    peak_before = roster_planner.peak_load()
+
+    applied_proposals = roster_planner.rebalance(max_moves=arguments.moves)
+    for proposal in applied_proposals:
+        sys.stdout.write(json.dumps(proposal) + "\n")
+    if arguments.apply:
+        for member_name in sorted({proposal["member"] for proposal in applied_proposals}):
+            _, merge_conflicts = save_schedule_checked(
+                roster_planner.member_schedules[member_name],
+                upgrade_schedule(roster_schedules[member_name], exercise_data),
+                os.path.join(arguments.roster_folder, f"{member_name}.json"), exercise_data=exercise_data)
+            for conflict in merge_conflicts:
+                print(f"{member_name}: {conflict}", file=sys.stderr)
+    print(f"{len(applied_proposals)} change(s); peak load {peak_before:.1f} -> {roster_planner.peak_load():.1f} "
+          f"station-minutes per station.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
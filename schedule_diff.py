@@ -0,0 +1,190 @@
+import copy
+import json
+
+from fitness_data import DAY_ORDER, parse_exercise_info
+from schedule_rules import day_selection_problem, muscle_assignment_problems
+
+# Diff, patch and three-way merge for saved schedules, so edits made on different devices
+# (e.g. the kiosk and at home) can be combined instead of the last save overwriting the other.
+#
+# A patch only lists the days that changed, using their position in "workout_schedule" (so it works
+# for a single week or for a long multi-week program), e.g.
+#   {"length": 7, "days": [{"day": 2, "rest": false, "muscles": {"add": ["Back"]},
+#                            "exercises": {"add": ["Deadlifts (Strength) - 5x6"]}}]}
+# Days added at the end of a longer program are sent whole in "append".
+LIST_FIELDS = {"muscles": "workout_purpose", "exercises": "exercises"}  # Patch name -> schedule field
+
+def entry_key(entry):
+    # Hashable key for a muscle or exercise entry (exercise entries may be strings or dictionaries)
+    return entry if isinstance(entry, str) else json.dumps(entry, sort_keys=True)
+
+def exercise_name_of(entry):
+    # The exercise name of an entry, used to spot both sides adding the same exercise differently
+    if isinstance(entry, str):
+        return parse_exercise_info(entry).exercise_name
+    return entry.get("name")
+
+def diff_list(old_list, new_list):
+    # Returns {"add": [...], "remove": [...]} for two lists treated as sets, or None if they match
+    old_keys = {entry_key(entry) for entry in old_list}
+    new_keys = {entry_key(entry) for entry in new_list}
+    added = [entry for entry in new_list if entry_key(entry) not in old_keys]
+    removed = [entry for entry in old_list if entry_key(entry) not in new_keys]
+    list_change = {}
+    if added:
+        list_change["add"] = added
+    if removed:
+        list_change["remove"] = removed
+    return list_change or None
+
+def diff_day(old_day, new_day):
+    # Returns the change for one day (only the fields that differ), or None if the day is unchanged
+    if old_day == new_day:  # Fast path: most days in a long program are untouched
+        return None
+    day_change = {}
+    if old_day.get("rest", True) != new_day.get("rest", True):
+        day_change["rest"] = new_day.get("rest", True)
+    if old_day.get("name") != new_day.get("name"):
+        day_change["name"] = new_day.get("name")
+    for patch_field, schedule_field in LIST_FIELDS.items():
+        list_change = diff_list(old_day.get(schedule_field, []), new_day.get(schedule_field, []))
+        if list_change:
+            day_change[patch_field] = list_change
+    return day_change or None
+
+def diff_schedules(old_schedule, new_schedule):
+    # Builds a compact patch that turns old_schedule into new_schedule
+    old_days = old_schedule.get("workout_schedule", [])
+    new_days = new_schedule.get("workout_schedule", [])
+    patch = {"length": len(new_days), "days": []}
+    for day_index in range(min(len(old_days), len(new_days))):
+        day_change = diff_day(old_days[day_index], new_days[day_index])
+        if day_change:
+            day_change["day"] = day_index
+            patch["days"].append(day_change)
+    if len(new_days) > len(old_days):
+        patch["append"] = new_days[len(old_days):]
+    return patch
+
+def apply_list_change(current_list, list_change):
+    # Applies an {"add", "remove"} change to a list, keeping the existing order
+    removed_keys = {entry_key(entry) for entry in list_change.get("remove", [])}
+    updated_list = [entry for entry in current_list if entry_key(entry) not in removed_keys]
+    present_keys = {entry_key(entry) for entry in updated_list}
+    for entry in list_change.get("add", []):
+        if entry_key(entry) not in present_keys:
+            updated_list.append(entry)
+            present_keys.add(entry_key(entry))
+    return updated_list
+
+def apply_patch(schedule_data, patch):
+    # Returns a new schedule with the patch applied; unchanged days are shared, not copied
+    day_entries = list(schedule_data.get("workout_schedule", []))[:patch["length"]]
+    for day_change in patch["days"]:
+        day_entry = dict(day_entries[day_change["day"]])
+        if "rest" in day_change:
+            day_entry["rest"] = day_change["rest"]
+        if "name" in day_change:
+            day_entry["name"] = day_change["name"]
+        for patch_field, schedule_field in LIST_FIELDS.items():
+            if patch_field in day_change:
+                day_entry[schedule_field] = apply_list_change(day_entry.get(schedule_field, []),
+                                                              day_change[patch_field])
+        day_entries[day_change["day"]] = day_entry
+    day_entries.extend(copy.deepcopy(patch.get("append", [])))
+    merged_schedule = dict(schedule_data)
+    merged_schedule["workout_schedule"] = day_entries
+    return merged_schedule
+
+def rule_problems(day_entries):
+    # Yields (day indexes involved, message) for every app rule the days break, checked one week at a time
+    week_length = len(DAY_ORDER)
+    for week_start in range(0, len(day_entries), week_length):
+        week_days = day_entries[week_start:week_start + week_length]
+        index_by_name = {day_entry.get("name"): week_start + offset for offset, day_entry in enumerate(week_days)}
+        muscles_by_day = {day_entry["name"]: day_entry.get("workout_purpose", []) for day_entry in week_days
+                          if not day_entry.get("rest", True) and day_entry.get("name") in DAY_ORDER}
+        if not muscles_by_day:
+            continue  # A week with no workout days is the blank template, which is allowed
+        selected_days = list(muscles_by_day)
+        day_problem = day_selection_problem(selected_days)
+        if day_problem:
+            yield list(index_by_name.values()), day_problem  # Too many or too few days involves the whole week
+        for rule, day_name, message in muscle_assignment_problems(selected_days, muscles_by_day):
+            involved_days = [day_name]
+            if rule == "consecutive_muscles":
+                involved_days.append(DAY_ORDER[DAY_ORDER.index(day_name) - 1])
+            yield [index_by_name[involved_day] for involved_day in involved_days], message
+
+def merge_schedules(base_schedule, our_schedule, their_schedule):
+    # Three-way merge of two edited copies against the schedule they both started from.
+    # Returns (merged schedule, list of conflict messages). Conflicts are always settled the same way:
+    #   - muscle and exercise lists: additions and removals from both sides are combined
+    #   - if one side made a day a rest day, the rest day wins and that day's muscles/exercises are dropped
+    #   - if both sides added the same exercise at a different intensity, our version is kept
+    #   - if both sides changed the program length, the longer version is kept (our days first)
+    #   - if the merged plan breaks one of the app's schedule rules (see schedule_rules), every day involved
+    #     that differs from our version goes back to our version
+    our_patch = diff_schedules(base_schedule, our_schedule)
+    their_patch = diff_schedules(base_schedule, their_schedule)
+    conflicts = []
+
+    merged_schedule = apply_patch(base_schedule, our_patch)
+    merged_days = merged_schedule["workout_schedule"]
+    our_changes = {day_change["day"]: day_change for day_change in our_patch["days"]}
+
+    for their_change in their_patch["days"]:
+        day_index = their_change["day"]
+        if day_index >= len(merged_days):
+            continue  # Day was cut from our (shorter) program; the longer-program rule below re-adds it
+        our_change = our_changes.get(day_index, {})
+        day_entry = dict(merged_days[day_index])
+        day_label = day_entry.get("name", f"day {day_index}")
+
+        if "rest" in their_change and "rest" not in our_change:
+            day_entry["rest"] = their_change["rest"]
+        for patch_field, schedule_field in LIST_FIELDS.items():
+            if patch_field not in their_change:
+                continue
+            their_list_change = dict(their_change[patch_field])
+            if patch_field == "exercises":
+                # Both sides added the same exercise at different intensities: keep ours
+                our_added_names = {exercise_name_of(entry)
+                                   for entry in our_change.get("exercises", {}).get("add", [])}
+                kept_additions = []
+                for entry in their_list_change.get("add", []):
+                    if exercise_name_of(entry) in our_added_names and entry not in our_change["exercises"].get("add", []):
+                        conflicts.append(f"{day_label}: both sides added {exercise_name_of(entry)} "
+                                         f"with different settings; kept ours.")
+                    else:
+                        kept_additions.append(entry)
+                their_list_change["add"] = kept_additions
+            day_entry[schedule_field] = apply_list_change(day_entry.get(schedule_field, []), their_list_change)
+
+        if day_entry.get("rest", True) and (day_entry.get("workout_purpose") or day_entry.get("exercises")):
+            conflicts.append(f"{day_label}: made a rest day on one side while edited on the other; rest day kept.")
+            day_entry["workout_purpose"] = []
+            day_entry["exercises"] = []
+        merged_days[day_index] = day_entry
+
+    # Program length: keep the longer program
+    their_days = their_schedule.get("workout_schedule", [])
+    if len(their_days) > len(merged_days):
+        if our_patch["length"] != len(base_schedule.get("workout_schedule", [])):
+            conflicts.append("Both sides changed the program length; kept the longer program.")
+        merged_days.extend(copy.deepcopy(their_days[len(merged_days):]))
+
+    # Each side was valid on its own, but combining them can still break a rule (e.g. too many workout days)
+    our_days = our_schedule.get("workout_schedule", [])
+    while True:
+        reverted_days = set()
+        for day_indexes, message in list(rule_problems(merged_days)):
+            for day_index in day_indexes:
+                if day_index < len(our_days) and merged_days[day_index] != our_days[day_index]:
+                    merged_days[day_index] = copy.deepcopy(our_days[day_index])
+                    reverted_days.add(day_index)
+                    conflicts.append(f"{merged_days[day_index].get('name', f'day {day_index}')}: the combined "
+                                     f"schedule breaks a rule ({message}); kept our version of this day.")
+        if not reverted_days:  # Valid now, or the rest of the problem was already in our version
+            break
+    return merged_schedule, conflicts
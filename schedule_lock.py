@@ -0,0 +1,138 @@
+import sys
+import time
+import argparse
+from contextlib import contextmanager
+
+from fitness_data import SCHEDULE_FILE, blank_schedule, load_schedule, write_schedule, make_exercise
+from schedule_diff import merge_schedules
+from migrate_data import upgrade_schedule
+
+try:
+    import fcntl   # Linux / macOS
+except ImportError:
+    fcntl = None
+    import msvcrt  # Windows
+
+# Safe saving when several copies of the app (e.g. two front-desk PCs on a shared drive) use the same
+# schedule file. Every saved schedule carries a "version" number:
+#   - readers just read the file (writes swap the whole file in at once, so readers never wait or see
+#     a half-written schedule)
+#   - writers take an advisory lock on "<schedule>.lock", check the version on disk, and if another
+#     copy saved in the meantime they merge with it (see schedule_diff.merge_schedules) instead of
+#     overwriting it.
+
+class StaleScheduleError(Exception):
+    # Raised when the schedule on disk changed since it was loaded and merging was not allowed
+    pass
+
+def schedule_version(schedule_data):
+    # Version number stored in a schedule (files saved before versioning count as version 0)
+    return schedule_data.get("version", 0)
+
+@contextmanager
+def schedule_file_lock(filename=SCHEDULE_FILE):
+    # Holds an exclusive advisory lock for the schedule file while writing it
+    with open(filename + ".lock", "a+") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            while True:  # msvcrt only retries for ~10 seconds, so keep waiting until it succeeds
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def save_schedule_checked(new_schedule, base_schedule, filename=SCHEDULE_FILE, allow_merge=True,
+                          changed_fields=None, exercise_data=None, on_saved=None):
+    # Saves new_schedule, which was edited from base_schedule (the copy as last loaded or saved).
+    # If the file was saved by someone else since then, the two edits are merged (or StaleScheduleError
+    # is raised when allow_merge is False). Passing base_schedule=None overwrites the file regardless.
+    # With changed_fields ({(day name, field)}), only those fields are copied onto the file when nobody else
+    # saved. With exercise_data, an older file on disk is upgraded first (see migrate_data.upgrade_schedule).
+    # on_saved(saved schedule) is called while the lock is still held.
+    # Returns (schedule that was saved, list of merge conflict messages).
+    conflicts = []
+    with schedule_file_lock(filename):
+        disk_schedule = load_schedule(filename)
+        disk_version = schedule_version(disk_schedule)
+        if exercise_data is not None:
+            disk_schedule = upgrade_schedule(disk_schedule, exercise_data)
+        if base_schedule is not None and schedule_version(base_schedule) != disk_version:
+            if not allow_merge:
+                raise StaleScheduleError(f"{filename} was saved elsewhere (version {disk_version}, "
+                                         f"this copy is version {schedule_version(base_schedule)}).")
+            saved_schedule, conflicts = merge_schedules(base_schedule, new_schedule, disk_schedule)
+        elif base_schedule is not None and changed_fields is not None:
+            saved_schedule = disk_schedule  # Unchanged on disk: only the fields edited here are copied onto it
+            saved_days = {day_entry["name"]: day_entry for day_entry in saved_schedule["workout_schedule"]}
+            new_days = {day_entry["name"]: day_entry for day_entry in new_schedule["workout_schedule"]}
+            for day_name, field_name in changed_fields:
+                saved_days[day_name][field_name] = new_days[day_name][field_name]
+        else:
+            saved_schedule = dict(new_schedule)
+        saved_schedule["version"] = disk_version + 1
+        write_schedule(saved_schedule, filename)
+        if on_saved is not None:
+            on_saved(saved_schedule)
+    return saved_schedule, conflicts
+
+def stress_worker(worker_arguments):
+    # One simulated app instance: hydrates the shared schedule once, then repeatedly edits and saves it
+    # through the same ScheduleModel the apps use. Each save adds a unique exercise for Chest, so any lost
+    # update shows up as a missing entry afterwards.
+    from schedule_model import ScheduleModel  # schedule_model imports this module
+    filename, worker_number, write_count = worker_arguments
+    schedule_model = ScheduleModel(filename)
+    schedule_model.hydrate({})
+    lock_wait_total = 0.0
+    for write_number in range(write_count):
+        schedule_model.add_exercises("Chest", [make_exercise(f"Worker {worker_number} Set {write_number}",
+                                                             "Chest", "Strength")])
+        started = time.perf_counter()
+        schedule_model.save()
+        lock_wait_total += time.perf_counter() - started
+    return lock_wait_total / write_count
+
+def run_stress_test(filename, process_count, write_count):
+    # Runs many writer processes at once against one file and checks that no update was lost
+    from multiprocessing import Pool  # Only the stress test needs it (the apps import the saving functions)
+    starting_schedule = {**blank_schedule(), "version": 0}
+    starting_schedule["workout_schedule"][0].update(rest=False, workout_purpose=["Chest"])
+    starting_schedule["workout_schedule"][2].update(rest=False, workout_purpose=["Back"])  # A valid two-day plan
+    write_schedule(starting_schedule, filename)
+    started = time.perf_counter()
+    with Pool(process_count) as worker_pool:
+        average_saves = worker_pool.map(stress_worker, [(filename, worker_number, write_count)
+                                                        for worker_number in range(process_count)])
+    elapsed = time.perf_counter() - started
+
+    final_schedule = load_schedule(filename)
+    saved_entries = {exercise_entry["name"] for exercise_entry in final_schedule["workout_schedule"][0]["exercises"]}
+    expected_entries = {f"Worker {worker_number} Set {write_number}"
+                        for worker_number in range(process_count) for write_number in range(write_count)}
+    lost_entries = expected_entries - saved_entries
+    print(f"{process_count} processes x {write_count} saves in {elapsed:.2f}s; "
+          f"average save {1000 * sum(average_saves) / len(average_saves):.2f} ms; "
+          f"final version {schedule_version(final_schedule)}; lost updates: {len(lost_entries)}")
+    return 1 if lost_entries else 0
+
+def main(argument_list=None):
+    parser = argparse.ArgumentParser(description="Stress test concurrent schedule saving.")
+    parser.add_argument("--file", default="stress_schedule.json", help="scratch schedule file to write")
+    parser.add_argument("--processes", type=int, default=24)
+    parser.add_argument("--writes", type=int, default=20, help="saves per process")
+    arguments = parser.parse_args(argument_list)
+    return run_stress_test(arguments.file, arguments.processes, arguments.writes)
+
+if __name__ == "__main__":
+    sys.exit(main())
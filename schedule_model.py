@@ -0,0 +1,116 @@
+import os
+import json
+
+from fitness_data import (SCHEDULE_FILE, blank_schedule, load_schedule, write_json_atomic, plan_schedule,
+                          add_exercises_to_schedule, swap_exercises_in_schedule)
+from migrate_data import upgrade_schedule
+from schedule_lock import save_schedule_checked
+
+# The one in-memory copy of the user's schedule that every frontend reads and edits.
+# It is hydrated once at startup. A snapshot file ("<schedule>.snapshot") holds the already-upgraded
+# schedule, keyed on the schedule file's modification time and size. If the file has not changed since
+# the snapshot was written, startup uses the snapshot and skips reading and upgrading the schedule again.
+# Edits mark the (day, field) pairs they change. Saving copies only those fields onto the schedule currently
+# on disk, under the schedule lock. If another copy of the app saved in the meantime, the two are merged
+# (see schedule_diff.merge_schedules).
+DAY_FIELDS = ["rest", "workout_purpose", "exercises"]  # Fields of a day entry that edits can change
+
+def snapshot_file_name(filename):
+    return filename + ".snapshot"
+
+def file_signature(filename):
+    # (modification time, size) of a file, or None if it does not exist
+    try:
+        file_stats = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return [file_stats.st_mtime_ns, file_stats.st_size]
+
+class ScheduleModel:
+    # The working schedule plus what is needed to save it safely (merge base and changed fields)
+    def __init__(self, filename=SCHEDULE_FILE):
+        self.filename = filename
+        self.schedule = blank_schedule()  # The working copy every window reads
+        self.base_schedule = blank_schedule()  # Copy as last loaded/saved; the base for merges
+        self.dirty_fields = set()  # (day name, field) pairs changed since the last save
+        self.exercise_data = {}
+
+    def hydrate(self, exercise_data, write_snapshot=True):
+        # Loads the schedule from disk once at startup (through the snapshot when it is still current).
+        # write_snapshot=False leaves the files untouched (e.g. when only measuring startup time).
+        self.exercise_data = exercise_data
+        source_signature = file_signature(self.filename)
+        try:
+            with open(snapshot_file_name(self.filename), "r") as snapshot_file:
+                snapshot_data = json.load(snapshot_file)
+        except (FileNotFoundError, ValueError):
+            snapshot_data = {}
+        if source_signature is not None and snapshot_data.get("source") == source_signature:
+            self.remember(snapshot_data["schedule"])
+            return "snapshot"
+        self.remember(upgrade_schedule(load_schedule(self.filename), exercise_data))  # Older saves are upgraded
+        if write_snapshot and source_signature is not None and file_signature(self.filename) == source_signature:
+            self.write_snapshot()  # Skipped if the file was saved again while we were reading it
+        return "file"
+
+    def remember(self, saved_schedule):
+        # Stores a schedule just loaded or saved as both the working copy and the merge base
+        self.schedule = saved_schedule
+        self.base_schedule = json.loads(json.dumps(saved_schedule))  # Deep copy the working copy can't touch
+        self.dirty_fields.clear()
+
+    def write_snapshot(self):
+        # Records the schedule as it is on disk, keyed on the file's current signature
+        write_json_atomic({"source": file_signature(self.filename), "schedule": self.base_schedule},
+                          snapshot_file_name(self.filename))
+
+    def day(self, day_name):
+        # The day entry for a weekday (None if the schedule has no such day)
+        return next((day_entry for day_entry in self.schedule["workout_schedule"]
+                     if day_entry["name"] == day_name), None)
+
+    def workout_days(self):
+        return [day_entry["name"] for day_entry in self.schedule["workout_schedule"] if not day_entry["rest"]]
+
+    def has_plan(self):
+        return bool(self.workout_days())
+
+    def mark_changed_days(self, old_days):
+        # Marks every field that differs from old_days ({day name: day entry})
+        for day_entry in self.schedule["workout_schedule"]:
+            old_day = old_days.get(day_entry["name"], {})
+            for field_name in DAY_FIELDS:
+                if day_entry.get(field_name) != old_day.get(field_name):
+                    self.dirty_fields.add((day_entry["name"], field_name))
+
+    def plan_days(self, muscles_by_day):
+        # Makes the days in muscles_by_day ({day: [muscles]}) the workout days (see fitness_data.plan_schedule)
+        old_days = {day_entry["name"]: day_entry for day_entry in self.schedule["workout_schedule"]}
+        self.schedule = {**self.schedule, **plan_schedule(self.schedule, muscles_by_day)}
+        self.mark_changed_days(old_days)
+
+    def add_exercises(self, muscle_name, exercise_objects):
+        # Adds exercises to every day training muscle_name (see fitness_data.add_exercises_to_schedule)
+        for day_name in add_exercises_to_schedule(self.schedule, muscle_name, exercise_objects):
+            self.dirty_fields.add((day_name, "exercises"))
+
+    def swap_exercises(self, swaps):
+        # Replaces exercises with their substitutes (see fitness_data.swap_exercises_in_schedule)
+        for day_name in swap_exercises_in_schedule(self.schedule, swaps):
+            self.dirty_fields.add((day_name, "exercises"))
+
+    def remember_saved(self, saved_schedule):
+        # Called under the schedule lock once a save is written, so the snapshot matches the file exactly
+        self.remember(saved_schedule)
+        self.write_snapshot()
+
+    def save(self):
+        # Writes the changed fields to disk, merging if another copy of the app saved since we loaded
+        # (see schedule_lock.save_schedule_checked). Returns (schedule that was saved, list of merge conflicts).
+        return save_schedule_checked(self.schedule, self.base_schedule, self.filename,
+                                     changed_fields=self.dirty_fields, exercise_data=self.exercise_data,
+                                     on_saved=self.remember_saved)
+
+    def reset(self):
+        # Replaces the schedule with a blank one on disk, whatever was saved there
+        save_schedule_checked(blank_schedule(), None, self.filename, on_saved=self.remember_saved)
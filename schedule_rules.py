@@ -0,0 +1,209 @@
+from functools import lru_cache
+
+from fitness_data import DAY_ORDER, load_catalog, exercise_from_entry
+
+# Schedule rules shared by the GUI wizard and the bulk validator, so both enforce exactly the same checks.
+MIN_WORKOUT_DAYS = 2   # Fewer than this is not enough for proper growth
+MAX_WORKOUT_DAYS = 5   # More than this leaves fewer than 2 rest days
+
+def are_consecutive_days(first_day, second_day):
+    # Utility function to detect if two days are back-to-back in the week
+    return abs(DAY_ORDER.index(first_day) - DAY_ORDER.index(second_day)) == 1
+
+# Precomputed plan-space tables. A set of workout days is a 7-bit "day mask" (bit 0 = Monday), so there
+# are only 128 possible day patterns; their validity and adjacency are worked out once at import.
+DAY_BITS = {day_name: 1 << day_index for day_index, day_name in enumerate(DAY_ORDER)}
+ALL_DAY_MASKS = range(1 << len(DAY_ORDER))
+
+def day_mask(selected_days):
+    # Turns a list of day names into a day mask
+    mask = 0
+    for day_name in selected_days:
+        mask |= DAY_BITS[day_name]
+    return mask
+
+def count_problem(workout_day_count):
+    # The rule on how many workout days a week is allowed (used to build DAY_MASK_PROBLEMS)
+    if workout_day_count == 0:
+        return "Please select at least one workout day."
+    if workout_day_count > MAX_WORKOUT_DAYS:
+        return "You must leave at least 2 rest days."
+    if workout_day_count < MIN_WORKOUT_DAYS:
+        return "1 Workout day a week is not enough for proper growth."
+    return None
+
+DAY_MASK_PROBLEMS = [count_problem(bin(mask).count("1")) for mask in ALL_DAY_MASKS]  # Error or None per mask
+VALID_DAY_MASKS = frozenset(mask for mask in ALL_DAY_MASKS if DAY_MASK_PROBLEMS[mask] is None)
+# Back-to-back workout day pairs (as day indexes) within each mask
+ADJACENT_DAY_PAIRS = [tuple((day_index, day_index + 1) for day_index in range(len(DAY_ORDER) - 1)
+                            if mask >> day_index & 1 and mask >> (day_index + 1) & 1)
+                      for mask in ALL_DAY_MASKS]
+# For each mask and day index: the mask of that day's workout neighbours
+NEIGHBOUR_DAY_MASKS = [tuple(mask & (((1 << (day_index - 1)) if day_index > 0 else 0) | (1 << (day_index + 1)))
+                             for day_index in range(len(DAY_ORDER)))
+                       for mask in ALL_DAY_MASKS]
+
+# Only the catalog's muscles get a bit, so the masks and the plan_is_valid cache stay small however many
+# misspelled names hand-edited files contain. Plans with other names take the slow path, which reports them.
+muscle_bits = {}  # Catalog muscle name -> bit, filled on first use
+
+def get_muscle_bits():
+    # Gives every catalog muscle its bit the first time the bits are needed and returns them
+    if not muscle_bits:
+        exercise_data, _ = load_catalog()
+        muscle_bits.update({muscle_name: 1 << bit_index for bit_index, muscle_name in enumerate(exercise_data)})
+    return muscle_bits
+
+def muscle_mask(muscle_names):
+    # Turns a list of catalog muscle names into a bit mask (None if a name is not in the catalog)
+    catalog_bits = get_muscle_bits()
+    mask = 0
+    for muscle_name in muscle_names:
+        if muscle_name not in catalog_bits:
+            return None
+        mask |= catalog_bits[muscle_name]
+    return mask
+
+@lru_cache(maxsize=65536)
+def plan_is_valid(selected_day_mask, day_muscle_masks):
+    # Memoised check of a whole weekly plan. day_muscle_masks holds one muscle mask per weekday.
+    if selected_day_mask not in VALID_DAY_MASKS:
+        return False
+    for day_index in range(len(DAY_ORDER)):
+        if selected_day_mask >> day_index & 1 and not day_muscle_masks[day_index]:
+            return False
+    return all(not day_muscle_masks[first_index] & day_muscle_masks[second_index]
+               for first_index, second_index in ADJACENT_DAY_PAIRS[selected_day_mask])
+
+def plan_masks(selected_days, muscles_by_day):
+    # The (day mask, per-day muscle masks) key used by plan_is_valid, or None if a muscle is not in the catalog
+    day_muscle_masks = tuple(muscle_mask(muscles_by_day.get(day_name, [])) if day_name in selected_days else 0
+                             for day_name in DAY_ORDER)
+    if None in day_muscle_masks:
+        return None
+    return day_mask(selected_days), day_muscle_masks
+
+def blocked_muscles(selected_days, muscles_by_day):
+    # For each selected day, the muscles already chosen on a neighbouring workout day (so the GUI can grey them out)
+    plan_key = plan_masks(selected_days, muscles_by_day)
+    if plan_key is None:  # A muscle outside the catalog: compare the names directly
+        return {day_name: {muscle_name for other_day in selected_days if are_consecutive_days(day_name, other_day)
+                           for muscle_name in muscles_by_day.get(other_day, [])}
+                for day_name in selected_days}
+    selected_day_mask, day_muscle_masks = plan_key
+    blocked_by_day = {}
+    for day_name in selected_days:
+        day_index = DAY_ORDER.index(day_name)
+        neighbour_mask = NEIGHBOUR_DAY_MASKS[selected_day_mask][day_index]
+        blocked_mask = 0
+        for other_index in range(len(DAY_ORDER)):
+            if neighbour_mask >> other_index & 1:
+                blocked_mask |= day_muscle_masks[other_index]
+        blocked_by_day[day_name] = {muscle_name for muscle_name, bit in muscle_bits.items() if blocked_mask & bit}
+    return blocked_by_day
+
+def day_selection_problem(selected_days):
+    # Returns the error message for an invalid set of workout days, or None if the days are valid
+    return DAY_MASK_PROBLEMS[day_mask(selected_days)]
+
+def muscle_assignment_problems(selected_days, muscles_by_day):
+    # Yields (rule, day, message) for every day with no muscles, or sharing a muscle with the day before it
+    plan_key = plan_masks(selected_days, muscles_by_day)
+    if plan_key is not None and plan_key[0] in VALID_DAY_MASKS and plan_is_valid(*plan_key):
+        return  # Fast path: a cached table lookup for plans that are already known to be valid
+    ordered_days = sorted(selected_days, key=DAY_ORDER.index)
+    for selected_index, day_name in enumerate(ordered_days):
+        chosen_muscles = muscles_by_day.get(day_name, [])
+        if not chosen_muscles:  # handles blank input error
+            yield "no_muscles", day_name, f"Select at least one muscle group for {day_name}."
+            continue
+
+        # Prevent hitting same muscle on consecutive days
+        if selected_index > 0:
+            previous_day = ordered_days[selected_index - 1]
+            if are_consecutive_days(previous_day, day_name):
+                overlapping_muscles = sorted(set(muscles_by_day.get(previous_day, [])) & set(chosen_muscles))
+                if overlapping_muscles:
+                    yield ("consecutive_muscles", day_name,
+                           f"You can't train these on consecutive days "
+                           f"({previous_day} → {day_name}): {', '.join(overlapping_muscles)}")
+
+def day_entry_problem(day_entry):
+    # Why a day entry's fields have the wrong types (e.g. a hand-edited file), or None if they can be read
+    if not isinstance(day_entry.get("rest", True), bool):
+        return "'rest' must be true or false."
+    muscle_list = day_entry.get("workout_purpose", [])
+    if not isinstance(muscle_list, list) or not all(isinstance(muscle_name, str) for muscle_name in muscle_list):
+        return "'workout_purpose' must be a list of muscle names."
+    if not isinstance(day_entry.get("exercises", []), list):
+        return "'exercises' must be a list."
+    return None
+
+def schedule_violations(schedule_data, exercise_data):
+    # Checks a whole saved schedule (e.g. an old or hand-edited file) and returns a list of violations.
+    # Each violation is a dictionary with the rule broken, the day (if any) and a readable message.
+    violations = []
+
+    def add_violation(rule, day_name, message):
+        violations.append({"rule": rule, "day": day_name, "message": message})
+
+    day_entries = schedule_data.get("workout_schedule") if isinstance(schedule_data, dict) else None
+    if not isinstance(day_entries, list):
+        add_violation("not_a_schedule", None, "File has no 'workout_schedule' list.")
+        return violations
+
+    seen_days = set()
+    muscles_by_day = {}
+    for day_entry in day_entries:
+        day_name = day_entry.get("name") if isinstance(day_entry, dict) else None
+        if day_name not in DAY_ORDER:
+            add_violation("unknown_day", None, f"Unknown day entry: {day_name!r}.")
+            continue
+        if day_name in seen_days:
+            add_violation("duplicate_day", day_name, f"{day_name} appears more than once.")
+            continue
+        seen_days.add(day_name)
+        entry_problem = day_entry_problem(day_entry)
+        if entry_problem:
+            add_violation("bad_day_entry", day_name, f"{day_name}: {entry_problem}")
+            continue
+
+        muscle_list = day_entry.get("workout_purpose", [])
+        exercise_list = day_entry.get("exercises", [])
+        if day_entry.get("rest", True):
+            if muscle_list or exercise_list:
+                add_violation("rest_day_has_workout", day_name,
+                              f"{day_name} is a rest day but still has muscles or exercises.")
+            continue
+        muscles_by_day[day_name] = muscle_list
+
+        for muscle_name in muscle_list:
+            if muscle_name not in exercise_data:
+                add_violation("unknown_muscle", day_name, f"{day_name} trains unknown muscle '{muscle_name}'.")
+        # Every exercise must come from the catalog list of one of that day's muscles
+        day_catalog = {exercise_name for muscle_name in muscle_list
+                       for exercise_name in exercise_data.get(muscle_name, [])}
+        for exercise_info in exercise_list:
+            if isinstance(exercise_info, dict) and isinstance(exercise_info.get("name"), str):
+                exercise_name = exercise_info["name"]
+            elif isinstance(exercise_info, str):
+                exercise_name = exercise_from_entry(exercise_info).exercise_name
+            else:
+                add_violation("bad_exercise", day_name, f"{day_name} has an unreadable exercise entry.")
+                continue
+            if exercise_name not in day_catalog:
+                add_violation("unknown_exercise", day_name,
+                              f"{day_name} has '{exercise_name}', which is not an exercise for its muscles.")
+
+    missing_days = [day_name for day_name in DAY_ORDER if day_name not in seen_days]
+    if missing_days:
+        add_violation("missing_days", None, f"Missing days: {', '.join(missing_days)}.")
+
+    # A schedule with no workout days is the blank template, which is allowed
+    if muscles_by_day:
+        day_problem = day_selection_problem(list(muscles_by_day))
+        if day_problem:
+            add_violation("workout_day_count", None, day_problem)
+        for rule, day_name, message in muscle_assignment_problems(list(muscles_by_day), muscles_by_day):
+            add_violation(rule, day_name, message)
+    return violations
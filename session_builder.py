@@ -0,0 +1,180 @@
+import sys
+import json
+import math
+import argparse
+
+from fitness_data import (CATALOG_FILE, load_catalog, get_intensity_profiles, make_exercise, exercise_from_entry,
+                          find_muscle_for_exercise, exercise_sub_muscles, load_roster_schedules)
+
+# Time-budgeted session builder ("I only have 45 minutes on Tuesday").
+# Each exercise's length is estimated from its intensity profile: sets x (reps x seconds_per_rep + rest),
+# plus setup time. The session is then chosen as a grouped knapsack solved with dynamic programming:
+#   1. for each muscle, a DP over its candidate exercises (state: minutes used and a bitmask of the sub-muscles
+#      covered; each exercise is skipped or done at one intensity) gives the best value for each number of
+#      minutes within the budget (these per-muscle tables are cached)
+#   2. a DP over the day's muscles shares the minute budget between them
+# Both grow with the number of exercises times the budget, not with every combination of exercises.
+# The value of a mix is mostly how many distinct sub-muscles it covers, then its volume (sets), with a
+# small bonus for keeping the intensity the member originally picked.
+SETUP_SECONDS = 60            # Moving to the station, loading the bar, etc.
+COVERAGE_VALUE = 100          # Value of each distinct sub-muscle covered
+KEPT_INTENSITY_VALUE = 5      # Bonus for keeping the intensity the member chose
+
+def exercise_minutes(exercise_obj):
+    # Estimated minutes for an exercise at its intensity, rounded up to a whole minute
+    profile = get_intensity_profiles()[exercise_obj.focus_type]
+    set_seconds = exercise_obj.reps * profile["seconds_per_rep"] + profile["rest_seconds"]
+    return math.ceil((exercise_obj.sets * set_seconds + SETUP_SECONDS) / 60)
+
+class SessionBuilder:
+    # Builds time-budgeted sessions from one catalog; per-muscle tables and whole sessions are cached,
+    # so building sessions for a whole roster mostly reuses earlier results.
+    def __init__(self, exercise_data, muscle_group_data):
+        self.exercise_data = exercise_data
+        self.muscle_group_data = muscle_group_data
+        self.muscle_tables = {}   # (muscle, candidates, budget) -> list of (minutes, value, exercise objects)
+        self.session_cache = {}   # (muscles and candidates, budget) -> built session
+
+    def muscle_table(self, muscle_name, candidates, budget_minutes):
+        # Best mixes for one muscle within budget_minutes, as a list of (minutes, value, exercises) with value
+        # rising with minutes. candidates is a tuple of (exercise name, focus type the member chose or None).
+        table_key = (muscle_name, candidates, budget_minutes)
+        if table_key in self.muscle_tables:
+            return self.muscle_tables[table_key]
+        group_sub_muscles = self.muscle_group_data.get(muscle_name, [])
+        # states maps (minutes, bitmask of covered sub-muscles) to the best (volume and kept-intensity value,
+        # exercises) that reaches it. Only the best is kept: what later exercises add depends on the state alone.
+        states = {(0, 0): (0, [])}
+        for exercise_name, chosen_focus in candidates:
+            sub_muscle_mask = 0
+            for sub_muscle in exercise_sub_muscles(exercise_name, muscle_name, self.muscle_group_data):
+                sub_muscle_mask |= 1 << group_sub_muscles.index(sub_muscle)
+            intensity_options = []
+            for focus_type in get_intensity_profiles():
+                exercise_obj = make_exercise(exercise_name, muscle_name, focus_type)
+                extra_value = exercise_obj.sets + (KEPT_INTENSITY_VALUE if focus_type == chosen_focus else 0)
+                intensity_options.append((exercise_minutes(exercise_obj), extra_value, exercise_obj))
+            new_states = dict(states)  # Skipping this exercise keeps every state
+            for (minutes, covered_mask), (extra_total, chosen_exercises) in states.items():
+                for option_minutes, extra_value, exercise_obj in intensity_options:
+                    if minutes + option_minutes > budget_minutes:
+                        continue
+                    state_key = (minutes + option_minutes, covered_mask | sub_muscle_mask)
+                    if state_key not in new_states or extra_total + extra_value > new_states[state_key][0]:
+                        new_states[state_key] = (extra_total + extra_value, chosen_exercises + [exercise_obj])
+            states = new_states
+        options = [(minutes, COVERAGE_VALUE * bin(covered_mask).count("1") + extra_total, chosen_exercises)
+                   for (minutes, covered_mask), (extra_total, chosen_exercises) in states.items()]
+
+        # Keep only mixes that beat every cheaper mix (the useful frontier for the DP)
+        options.sort(key=lambda option: (option[0], -option[1]))
+        frontier = []
+        for option in options:
+            if not frontier or option[1] > frontier[-1][1]:
+                frontier.append(option)
+        self.muscle_tables[table_key] = frontier
+        return frontier
+
+    def day_candidates(self, day_entry):
+        # Candidate exercises per muscle: the member's chosen exercises, or the whole catalog list if none
+        day_muscles = day_entry.get("workout_purpose", [])
+        chosen_by_muscle = {muscle_name: {} for muscle_name in day_muscles}
+        for exercise_entry in day_entry.get("exercises", []):
+            exercise_obj = exercise_from_entry(exercise_entry)
+            muscle_name = exercise_obj.muscle_group or find_muscle_for_exercise(exercise_obj.exercise_name,
+                                                                                day_muscles, self.exercise_data)
+            if muscle_name in chosen_by_muscle:
+                chosen_by_muscle[muscle_name][exercise_obj.exercise_name] = exercise_obj.focus_type
+        return tuple(
+            (muscle_name, tuple(chosen_by_muscle[muscle_name].items()) or
+             tuple((exercise_name, None) for exercise_name in self.exercise_data.get(muscle_name, [])))
+            for muscle_name in day_muscles
+        )
+
+    def build_session(self, day_entry, budget_minutes):
+        # Picks the exercises and intensities for one day that give the most coverage within the budget.
+        # Returns {"exercises": [Exercise, ...], "minutes": total, "uncovered_muscles": [...]}.
+        candidates_by_muscle = self.day_candidates(day_entry)
+        cache_key = (candidates_by_muscle, budget_minutes)
+        if cache_key in self.session_cache:
+            return self.session_cache[cache_key]
+
+        # best_values[t] = best value within t minutes using the muscles so far; choices remembers how
+        best_values = [0] * (budget_minutes + 1)
+        choices = []
+        for muscle_name, candidates in candidates_by_muscle:
+            table = self.muscle_table(muscle_name, candidates, budget_minutes)
+            new_values = list(best_values)
+            picked_options = [0] * (budget_minutes + 1)  # Index into table (0 = nothing for this muscle)
+            for option_index, (minutes, value, _) in enumerate(table):
+                if minutes == 0 or minutes > budget_minutes:
+                    continue
+                for total_minutes in range(minutes, budget_minutes + 1):
+                    candidate_value = best_values[total_minutes - minutes] + value
+                    if candidate_value > new_values[total_minutes]:
+                        new_values[total_minutes] = candidate_value
+                        picked_options[total_minutes] = option_index
+            best_values = new_values
+            choices.append((table, picked_options))
+
+        # Walk back through the muscles to recover the chosen mix
+        session_exercises = []
+        uncovered_muscles = []
+        remaining_minutes = budget_minutes
+        for (table, picked_options), (muscle_name, _) in zip(reversed(choices), reversed(candidates_by_muscle)):
+            minutes, _, chosen_exercises = table[picked_options[remaining_minutes]]
+            if not chosen_exercises:
+                uncovered_muscles.append(muscle_name)
+            session_exercises = chosen_exercises + session_exercises
+            remaining_minutes -= minutes
+
+        session = {
+            "exercises": session_exercises,
+            "minutes": budget_minutes - remaining_minutes,
+            "uncovered_muscles": list(reversed(uncovered_muscles))
+        }
+        self.session_cache[cache_key] = session
+        return session
+
+def build_roster_sessions(roster_schedules, exercise_data, muscle_group_data, budget_minutes):
+    # Builds every workout day's session for every member with one shared (cached) builder.
+    # budget_minutes is either a number, or {member: {day: minutes}} for per-member budgets.
+    session_builder = SessionBuilder(exercise_data, muscle_group_data)
+    roster_sessions = {}
+    for member_name, schedule_data in roster_schedules.items():
+        for day_entry in schedule_data.get("workout_schedule", []):
+            if day_entry.get("rest", True):
+                continue
+            if isinstance(budget_minutes, dict):
+                day_budget = budget_minutes.get(member_name, {}).get(day_entry["name"])
+                if day_budget is None:
+                    continue
+            else:
+                day_budget = budget_minutes
+            roster_sessions.setdefault(member_name, {})[day_entry["name"]] = \
+                session_builder.build_session(day_entry, day_budget)
+    return roster_sessions
+
+def main(argument_list=None):
+    parser = argparse.ArgumentParser(description="Fit every member's workout days into a time budget.")
+    parser.add_argument("roster_folder", help="folder of <member>.json schedule files")
+    parser.add_argument("--minutes", type=int, default=45, help="time budget per workout day")
+    parser.add_argument("--catalog", default=CATALOG_FILE)
+    arguments = parser.parse_args(argument_list)
+
+    exercise_data, muscle_group_data = load_catalog(arguments.catalog)
+    roster_sessions = build_roster_sessions(load_roster_schedules(arguments.roster_folder),
+                                            exercise_data, muscle_group_data, arguments.minutes)
+    for member_name, day_sessions in roster_sessions.items():
+        for day_name, session in day_sessions.items():
+            sys.stdout.write(json.dumps({
+                "member": member_name,
+                "day": day_name,
+                "minutes": session["minutes"],
+                "exercises": [exercise_obj.get_info() for exercise_obj in session["exercises"]],
+                "uncovered_muscles": session["uncovered_muscles"]
+            }) + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
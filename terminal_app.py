@@ -0,0 +1,232 @@
+import time
+startup_started = time.perf_counter()  # Taken first so the startup profile covers every import
+
+import sys
+import argparse
+
+from fitness_data import (DAY_ORDER, load_catalog, get_intensity_profiles, describe_intensity,
+                          get_default_intensity, make_exercise, describe_muscle_hit, describe_schedule,
+                          get_exercise_details)
+from schedule_rules import day_selection_problem, muscle_assignment_problems, blocked_muscles
+from schedule_model import ScheduleModel
+from event_log import EventLog
+from history_archive import snapshot_week_if_needed, archive_previous_schedule
+
+# Terminal version of the V5 app for SSH sessions and gym-floor thin clients: a plain input() loop like V1,
+# without tkinter. It shares the catalog, schedule operations, validation rules and locked saving with V5,
+# so a schedule made here is exactly the one the GUI would make from the same choices.
+# "--profile-startup" prints how long startup took (compare with the same flag on V5). Like V5, a profiling run
+# only reads the user's data: no event log, weekly history snapshot or schedule snapshot is written.
+
+exercise_data = {}        # Dictionary of main muscles containing the necessary values of exercises.
+muscle_group_data = {}    # Dictionary of main muscles with values as sub-muscles
+schedule_model = ScheduleModel()  # The same in-memory schedule model V5 uses, hydrated in main
+event_log = None          # Same action log as V5, so terminal sessions can be replayed too (created in main)
+substitute_indexes = []   # Ranked substitute exercises, built the first time equipment is marked unavailable
+
+def save_schedule():
+    # Saves the changed fields, merging with any save made by another copy of the app since we last loaded it
+    edited_days = schedule_model.schedule["workout_schedule"]
+    saved_schedule, merge_conflicts = schedule_model.save()
+    if saved_schedule["workout_schedule"] != edited_days:
+        event_log.log("schedule_merged", schedule=saved_schedule)
+    event_log.flush()  # Every saved step is on disk, so a crash or kill doesn't lose the session
+    if merge_conflicts:
+        print("This schedule was also changed on another device:\n" + "\n".join(merge_conflicts))
+
+def choose_from_list(prompt, options, allow_many=False):
+    # Prints numbered options and reads the user's choice(s); returns the chosen option(s), or None if blank
+    for option_number, option in enumerate(options, start=1):
+        print(f"  {option_number}. {option}")
+    while True:
+        answer = input(prompt).strip()
+        if not answer:
+            return None
+        answer_parts = answer.replace(",", " ").split()
+        if all(part.isdigit() and 1 <= int(part) <= len(options) for part in answer_parts) \
+                and (allow_many or len(answer_parts) == 1):
+            chosen_options = [options[int(part) - 1] for part in answer_parts]
+            return chosen_options if allow_many else chosen_options[0]
+        print("Invalid input \nPlease enter the number(s) shown in the list.")
+
+def view_week():
+    # Displays each day of the week and whether it is a workout or rest day, plus recovery warnings
+    for day_entry in schedule_model.schedule["workout_schedule"]:
+        if day_entry["rest"]:
+            print(f"{day_entry['name']}: Rest Day")
+        else:
+            print(f"{day_entry['name']}: Workout Day → {', '.join(day_entry['workout_purpose']) or '(none)'}")
+    import recovery_model  # NumPy is only loaded if the week is actually viewed
+    for note in recovery_model.recovery_warnings(schedule_model.schedule, exercise_data, muscle_group_data):
+        print(f"⚠️ {note}")
+
+def create_schedule():
+    # Chooses the workout days, then the muscles for each day (same rules as the V5 wizard)
+    while True:
+        print("Days of the week:", ", ".join(DAY_ORDER))
+        day_input = input("Which days do you want to work out? (Separate days with spaces): ")
+        selected_days = [day_name.strip().capitalize() for day_name in day_input.split()]
+        if not all(day_name in DAY_ORDER for day_name in selected_days):
+            print("Invalid input \nPlease enter a valid day from the week.")
+            continue
+        selected_days = sorted(set(selected_days), key=DAY_ORDER.index)
+        day_problem = day_selection_problem(selected_days)
+        event_log.log("days_selected", days=selected_days)
+        if day_problem:
+            print(day_problem)
+            continue
+        break
+
+    muscle_names = list(exercise_data)
+    while True:
+        muscles_by_day = {day_name: [] for day_name in selected_days}
+        for day_name in selected_days:
+            # Muscles already chosen for a neighbouring workout day are not offered (V5 greys them out)
+            blocked = blocked_muscles(selected_days, muscles_by_day)[day_name]
+            print(f"\nMuscles for {day_name}" + (f" (not {', '.join(sorted(blocked))}: trained the day next to it)"
+                                                 if blocked else "") + ":")
+            chosen_muscles = choose_from_list("Choose muscles (numbers separated by spaces): ",
+                                              muscle_names, allow_many=True) or []
+            muscles_by_day[day_name] = [muscle_name for muscle_name in dict.fromkeys(chosen_muscles)
+                                        if muscle_name not in blocked]
+        event_log.log("muscles_assigned", muscles_by_day=muscles_by_day)
+        first_problem = next(muscle_assignment_problems(selected_days, muscles_by_day), None)
+        if first_problem is None:
+            break
+        print(f"⚠️ {first_problem[2]}")  # Only the first problem is shown, as in the GUI
+
+    archive_previous_schedule(schedule_model.schedule, "re-create")  # Keep the old plan in the history archive
+    schedule_model.plan_days(muscles_by_day)
+    save_schedule()
+    print("✅ Schedule created successfully!")
+    view_week()
+
+def choose_exercises_for_muscle():
+    # Picks a muscle, some of its exercises and an intensity for each, then adds them to matching days
+    selected_muscle = choose_from_list("Select a muscle group (number): ", list(muscle_group_data))
+    if selected_muscle is None:
+        return
+    print(describe_muscle_hit(selected_muscle, muscle_group_data))
+    if selected_muscle not in exercise_data:
+        print(f"No exercises found for {selected_muscle}.")
+        return
+
+    print(f"\nExercises for {selected_muscle}:")
+    selected_exercises = choose_from_list("Select exercises (numbers separated by spaces): ",
+                                          exercise_data[selected_muscle], allow_many=True)
+    if not selected_exercises:
+        print("Please select at least one exercise.")
+        return
+
+    intensity_names = list(get_intensity_profiles())
+    print()
+    for focus_type in intensity_names:
+        print(describe_intensity(focus_type))
+    exercise_objects = []
+    for exercise_name in dict.fromkeys(selected_exercises):
+        print(f"\nIntensity for {exercise_name} (blank for {get_default_intensity()}):")
+        focus_type = choose_from_list("Intensity (number): ", intensity_names) or get_default_intensity()
+        exercise_objects.append(make_exercise(exercise_name, selected_muscle, focus_type))
+
+    event_log.log("exercises_added", muscle=selected_muscle,
+                  exercises=[{"name": exercise_obj.exercise_name, "focus_type": exercise_obj.focus_type}
+                             for exercise_obj in exercise_objects])
+    schedule_model.add_exercises(selected_muscle, exercise_objects)
+    save_schedule()
+    print(f"✅ Added {len(exercise_objects)} exercise(s) for {selected_muscle}.")
+
+def swap_unavailable_exercises():
+    # Swaps every exercise that needs unavailable equipment for its closest substitute (same as V5)
+    if not schedule_model.has_plan():
+        print("Create a workout schedule first.")
+        return
+    equipment_text = input("Which equipment is unavailable? (separate with commas, e.g. barbell, squat rack): ")
+    unavailable_equipment = {equipment_name.strip().lower() for equipment_name in equipment_text.split(",")
+                             if equipment_name.strip()}
+    if not unavailable_equipment:
+        return
+
+    from exercise_substitutes import SubstituteIndex, plan_swaps  # Only imported and built the first time
+    if not substitute_indexes:
+        substitute_indexes.append(SubstituteIndex(exercise_data, muscle_group_data, get_exercise_details()))
+    unknown_equipment = substitute_indexes[0].unknown_equipment(unavailable_equipment)
+    if unknown_equipment:
+        print(f"Unknown equipment: {', '.join(unknown_equipment)}. "
+              f"Choose from: {', '.join(sorted(substitute_indexes[0].known_equipment))}.")
+        return
+    swaps, stuck = plan_swaps(schedule_model.schedule, unavailable_equipment, substitute_indexes[0], exercise_data)
+    if swaps:
+        event_log.log("exercises_swapped", unavailable=sorted(unavailable_equipment), swaps=swaps)
+        schedule_model.swap_exercises(swaps)
+        save_schedule()
+    for swap in swaps:
+        print(f"{swap['day']}: {swap['exercise']} → {swap['replacement']}")
+    if not swaps:
+        print("No exercises needed swapping.")
+    if stuck:
+        print("No substitute without that equipment:\n" + "\n".join(stuck))
+
+def reset_all_data():
+    # Clears all stored schedule data and resets the file
+    if input("Reset all data (clear JSON and in-memory schedule)? (y/n): ").strip().lower() != "y":
+        return
+    event_log.log("reset")
+    archive_previous_schedule(schedule_model.schedule, "reset")  # Keep the old plan in the history archive
+    schedule_model.reset()  # A reset always overwrites
+    event_log.flush()
+    print("✅ All data has been reset.")
+
+def main(argument_list=None):
+    global event_log
+    parser = argparse.ArgumentParser(description="Zane's Fitness App in the terminal.")
+    parser.add_argument("--profile-startup", action="store_true", help="print how long startup took")
+    arguments = parser.parse_args(argument_list)
+    event_log = EventLog(enabled=not arguments.profile_startup)
+
+    catalog_exercises, catalog_muscle_groups = load_catalog()
+    exercise_data.update(catalog_exercises)
+    muscle_group_data.update(catalog_muscle_groups)
+    # Older saves are upgraded in memory (or read from the snapshot)
+    schedule_model.hydrate(exercise_data, write_snapshot=not arguments.profile_startup)
+    event_log.log("session_started", frontend="terminal", schedule=schedule_model.schedule)  # Starting point for replays
+    if arguments.profile_startup:
+        print(f"Startup took {time.perf_counter() - startup_started:.4f}s.")
+    else:
+        snapshot_week_if_needed(schedule_model.schedule)  # First start of each week archives the current plan
+
+    print("Welcome to Zane's Fitness App! We are here to help you grow and improve yourself.")
+    # The program runs continuously until the user chooses to exit.
+    while True:
+        option = input(
+            "\nHow would you like to improve yourself today? "
+            "\nType 1 to create your workout schedule "
+            "\nType 2 to choose exercises for a muscle "
+            "\nType 3 to view your week "
+            "\nType 4 to view the full schedule "
+            "\nType 5 to reset all data "
+            "\nType 6 to swap exercises for unavailable equipment "
+            "\nType 9 to end the program "
+            "\n:"
+        ).strip()
+
+        if option == "1":
+            create_schedule()
+        elif option == "2":
+            choose_exercises_for_muscle()
+        elif option == "3":
+            view_week()
+        elif option == "4":
+            print(describe_schedule(schedule_model.schedule))
+        elif option == "5":
+            reset_all_data()
+        elif option == "6":
+            swap_unavailable_exercises()
+        elif option == "9":
+            print("Thank you for using this program! Have a great day :D")
+            break
+        else:
+            print("Invalid input \nPlease type one of the options shown.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
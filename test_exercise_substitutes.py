@@ -0,0 +1,73 @@
+import os
+import json
+
+import pytest
+
+from fitness_data import (blank_schedule, load_catalog, load_exercise_details, load_schedule, make_exercise,
+                          swap_exercises_in_schedule)
+from exercise_substitutes import SubstituteIndex, plan_swaps, main
+
+# Tests for the equipment substitutes. Run with "python -m pytest".
+
+def substitute_index():
+    exercise_data, muscle_group_data = load_catalog()
+    return SubstituteIndex(exercise_data, muscle_group_data, load_exercise_details())
+
+def test_catalog_equipment_names_are_known():
+    assert substitute_index().unknown_equipment({"barbell", "squat rack"}) == []
+
+def test_misspelled_equipment_is_reported():
+    assert substitute_index().unknown_equipment({"barbells", "barbell", "squatrack"}) == ["barbells", "squatrack"]
+
+def test_cli_refuses_unknown_equipment(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--unavailable", "barbells", "--schedule", str(tmp_path / "schedule.json")])
+    assert exit_info.value.code == 2
+    assert "unknown equipment: barbells" in capsys.readouterr().err
+    assert not os.listdir(tmp_path)  # Nothing was read or written
+
+def test_roster_swaps_are_saved_with_a_new_version(tmp_path):
+    schedule_data = {**blank_schedule(), "version": 2}
+    schedule_data["workout_schedule"][0].update(rest=False, workout_purpose=["Chest"], exercises=[
+        make_exercise("Barbell Bench Press", "Chest", "Strength").to_entry()])
+    (tmp_path / "member.json").write_text(json.dumps(schedule_data))
+    assert main(["--unavailable", "barbell", "--roster", str(tmp_path), "--apply"]) == 0
+    saved_schedule = load_schedule(str(tmp_path / "member.json"))
+    assert saved_schedule["version"] == 3
+    assert [exercise["name"] for exercise in saved_schedule["workout_schedule"][0]["exercises"]] != [
+        "Barbell Bench Press"]
+
+# A small made-up catalog: A and B share "mid", C trains only "lower"; only A needs a barbell
+SMALL_EXERCISES = {"Chest": ["A", "B", "C"]}
+SMALL_MUSCLE_GROUPS = {"Chest": ["upper", "mid", "lower"]}
+SMALL_DETAILS = {"A": {"equipment": ["barbell"], "sub_muscles": ["upper", "mid"]},
+                 "B": {"equipment": [], "sub_muscles": ["mid"]},
+                 "C": {"equipment": ["dumbbells"], "sub_muscles": ["lower"]}}
+
+def small_schedule(exercise_entries):
+    schedule_data = blank_schedule()
+    schedule_data["workout_schedule"][0].update(rest=False, workout_purpose=["Chest"], exercises=exercise_entries)
+    return schedule_data
+
+def test_substitutes_are_ranked_by_sub_muscle_overlap():
+    small_index = SubstituteIndex(SMALL_EXERCISES, SMALL_MUSCLE_GROUPS, SMALL_DETAILS)
+    assert small_index.substitutes("A", "Chest") == [("B", 0.5), ("C", 0.0)]
+    assert small_index.substitutes("C", "Chest") == [("A", 0.0), ("B", 0.0)]  # Ties keep catalog order
+    assert small_index.best_substitute("A", "Chest", frozenset({"barbell"})) == "B"
+
+def test_plan_swaps_skips_exercises_already_planned_that_day():
+    small_index = SubstituteIndex(SMALL_EXERCISES, SMALL_MUSCLE_GROUPS, SMALL_DETAILS)
+    schedule_data = small_schedule([{"name": "A", "muscle": "Chest", "focus_type": "Strength", "sets": 5, "reps": 6},
+                                    {"name": "B", "muscle": "Chest", "focus_type": "Hypertrophy", "sets": 4,
+                                     "reps": 12}])
+    swaps, stuck = plan_swaps(schedule_data, {"barbell"}, small_index, SMALL_EXERCISES)
+    assert swaps == [{"day": "Monday", "exercise": "A", "replacement": "C"}] and stuck == []
+    swaps, stuck = plan_swaps(schedule_data, {"barbell", "dumbbells"}, small_index, SMALL_EXERCISES)
+    assert swaps == [] and stuck == ["Monday: A"]
+
+def test_swapped_exercise_keeps_intensity_sets_and_reps():
+    schedule_data = small_schedule([{"name": "A", "muscle": "Chest", "focus_type": "Strength", "sets": 6, "reps": 3}])
+    assert swap_exercises_in_schedule(schedule_data, [{"day": "Monday", "exercise": "A", "replacement": "C"}]) == [
+        "Monday"]
+    assert schedule_data["workout_schedule"][0]["exercises"] == [
+        {"name": "C", "muscle": "Chest", "focus_type": "Strength", "sets": 6, "reps": 3}]
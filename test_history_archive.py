@@ -0,0 +1,23 @@
+import datetime
+
+from fitness_data import blank_schedule
+from history_archive import snapshot_week_if_needed, load_index, read_columns, DEFAULT_MEMBER
+
+# Tests for the weekly history archive.
+
+def weekly_snapshot_weeks(history_folder):
+    # The week (as an ISO date) of every snapshot in the archive, per year
+    snapshot_weeks = {}
+    for year_text, year_entry in load_index(DEFAULT_MEMBER, history_folder).items():
+        columns = read_columns(DEFAULT_MEMBER, year_text, year_entry, ["snapshot_week"], history_folder)
+        snapshot_weeks[year_text] = [datetime.date.fromordinal(week_ordinal).isoformat()
+                                     for week_ordinal in columns["snapshot_week"]]
+    return snapshot_weeks
+
+def test_week_spanning_new_year_is_snapshotted_once(tmp_path):
+    history_folder = str(tmp_path)
+    assert snapshot_week_if_needed(blank_schedule(), when=datetime.datetime(2025, 12, 29), history_folder=history_folder)
+    assert not snapshot_week_if_needed(blank_schedule(), when=datetime.datetime(2026, 1, 1),
+                                       history_folder=history_folder)
+    assert snapshot_week_if_needed(blank_schedule(), when=datetime.datetime(2026, 1, 5), history_folder=history_folder)
+    assert weekly_snapshot_weeks(history_folder) == {"2025": ["2025-12-29"], "2026": ["2026-01-05"]}
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import migrate_data
+from fitness_data import CATALOG_FILE, SCHEDULE_FORMAT, blank_schedule
+from catalog_workers import init_worker
+from migrate_data import migrate_file
+
+# Tests for migrating old (V3-V5) schedule files, including hand-edited ones.
+
+@pytest.fixture(autouse=True)
+def catalog_loaded():
+    init_worker(CATALOG_FILE)
+
+def write_old_schedule(tmp_path, monday_exercises):
+    # Writes a V3-V5 style schedule (no "format") whose Monday trains Chest
+    schedule_data = blank_schedule()
+    schedule_data.pop("format", None)
+    schedule_data["workout_schedule"][0].update({"rest": False, "workout_purpose": ["Chest"],
+                                                 "exercises": monday_exercises})
+    file_path = tmp_path / "member.json"
+    file_path.write_text(json.dumps(schedule_data))
+    return file_path
+
+def test_old_schedule_is_upgraded(tmp_path):
+    file_path = write_old_schedule(tmp_path, ["Chest Dips (Strength) - 5x6"])
+    assert migrate_file(str(file_path))["action"] == "migrated"
+    upgraded_schedule = json.loads(file_path.read_text())
+    assert upgraded_schedule["format"] == SCHEDULE_FORMAT
+    assert upgraded_schedule["workout_schedule"][0]["exercises"] == [
+        {"name": "Chest Dips", "muscle": "Chest", "focus_type": "Strength", "sets": 5, "reps": 6}]
+
+@pytest.mark.parametrize("monday_exercises", ["oops", None, [["Chest Dips"]], [{"sets": 3}]])
+def test_wrong_types_fail_without_rewriting_the_file(tmp_path, monday_exercises):
+    file_path = write_old_schedule(tmp_path, monday_exercises)
+    original_text = file_path.read_text()
+    assert migrate_file(str(file_path))["action"] == "failed"
+    assert file_path.read_text() == original_text
+
+@pytest.mark.parametrize("monday_exercises", [["Deadlifts (Power) - 3x3"],
+                                              [{"name": "Chest Dips", "focus_type": "Power", "sets": 3, "reps": 3}]])
+def test_unknown_intensity_fails_instead_of_becoming_the_default(tmp_path, monday_exercises):
+    file_path = write_old_schedule(tmp_path, monday_exercises)
+    original_text = file_path.read_text()
+    report = migrate_file(str(file_path))
+    assert report["action"] == "failed" and "'Power'" in report["message"]
+    assert file_path.read_text() == original_text
+
+def test_any_error_fails_only_that_file(tmp_path, monkeypatch):
+    def failing_write(schedule_data, filename):
+        raise OSError("disk full")
+    monkeypatch.setattr(migrate_data, "write_schedule", failing_write)
+    file_path = write_old_schedule(tmp_path, ["Chest Dips (Strength) - 5x6"])
+    report = migrate_file(str(file_path))
+    assert report["action"] == "failed" and "disk full" in report["message"]
@@ -0,0 +1,48 @@
+import json
+
+from fitness_data import blank_schedule, load_catalog, load_exercise_details, load_schedule, make_exercise
+from roster_planner import RosterPlanner, schedule_problem, main
+
+# Tests for the equipment-aware roster planner.
+
+def barbell_member():
+    # Chest on Monday and Back on Thursday, both with barbell exercises
+    schedule_data = {**blank_schedule(), "version": 4}
+    schedule_data["workout_schedule"][0].update(rest=False, workout_purpose=["Chest"], exercises=[
+        make_exercise("Barbell Bench Press", "Chest", "Strength").to_entry()])
+    schedule_data["workout_schedule"][3].update(rest=False, workout_purpose=["Back"], exercises=[
+        make_exercise("Barbell Rows", "Back", "Strength").to_entry()])
+    return schedule_data
+
+def roster_planner():
+    exercise_data, _ = load_catalog()
+    return RosterPlanner(exercise_data, load_exercise_details())
+
+def test_rebalance_lowers_the_peak_and_keeps_plans_valid():
+    planner = roster_planner()
+    for member_number in range(4):
+        planner.add_member(f"member{member_number}", barbell_member(), rebalance=False)
+    peak_before = planner.peak_load()
+    assert planner.rebalance()
+    assert planner.peak_load() < peak_before
+    assert [schedule_problem(schedule_data) for schedule_data in planner.member_schedules.values()] == [None] * 4
+
+def test_adding_a_member_rebalances_only_their_plan():
+    planner = roster_planner()
+    planner.add_member("first", barbell_member())
+    first_schedule = planner.member_schedules["first"]
+    peak_before = planner.peak_load() * 2  # What the second member would add if nothing moved
+    applied_proposals = planner.add_member("second", barbell_member())
+    assert {proposal["member"] for proposal in applied_proposals} == {"second"}
+    assert planner.member_schedules["first"] == first_schedule
+    assert planner.peak_load() < peak_before
+    assert schedule_problem(planner.member_schedules["second"]) is None
+
+def test_applied_changes_are_saved_with_a_new_version(tmp_path):
+    for member_number in range(3):
+        (tmp_path / f"member{member_number}.json").write_text(json.dumps(barbell_member()))
+    assert main([str(tmp_path), "--apply"]) == 0
+    saved_versions = [load_schedule(str(tmp_path / f"member{member_number}.json")).get("version")
+                      for member_number in range(3)]
+    assert 5 in saved_versions and set(saved_versions) <= {4, 5}
+    assert not list(tmp_path.glob("*.tmp"))
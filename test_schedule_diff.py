@@ -0,0 +1,97 @@
+import copy
+
+from fitness_data import DAY_ORDER, load_catalog
+from schedule_diff import diff_schedules, apply_patch, merge_schedules
+from schedule_rules import schedule_violations
+
+# Tests for schedule diff, patch and three-way merge. Run with "python -m pytest".
+
+def make_schedule(muscles_by_day, exercises_by_day=None):
+    # A format 2 week where the days in muscles_by_day are workout days
+    exercises_by_day = exercises_by_day or {}
+    return {"format": 2, "workout_schedule": [
+        {"name": day_name, "rest": day_name not in muscles_by_day,
+         "workout_purpose": list(muscles_by_day.get(day_name, [])),
+         "exercises": list(exercises_by_day.get(day_name, []))}
+        for day_name in DAY_ORDER]}
+
+def workout_plan(schedule_data):
+    return {day_entry["name"]: day_entry["workout_purpose"]
+            for day_entry in schedule_data["workout_schedule"] if not day_entry["rest"]}
+
+def bench_press(focus_type, sets, reps):
+    return {"name": "Barbell Bench Press", "muscle": "Chest", "focus_type": focus_type, "sets": sets, "reps": reps}
+
+BASE = make_schedule({"Monday": ["Chest"], "Wednesday": ["Back"], "Friday": ["Quads"]})
+
+def test_diff_of_identical_schedules_is_empty():
+    assert diff_schedules(BASE, copy.deepcopy(BASE)) == {"length": 7, "days": []}
+
+def test_diff_lists_only_changed_days():
+    edited = make_schedule({"Monday": ["Chest", "Triceps"], "Wednesday": ["Back"], "Friday": ["Quads"]})
+    patch = diff_schedules(BASE, edited)
+    assert patch["days"] == [{"day": 0, "muscles": {"add": ["Triceps"]}}]
+
+def test_patch_round_trip():
+    edited = make_schedule({"Tuesday": ["Back"], "Thursday": ["Chest"], "Saturday": ["Quads"]},
+                           {"Thursday": [bench_press("Strength", 5, 6)]})
+    assert apply_patch(BASE, diff_schedules(BASE, edited)) == edited
+
+def test_patch_appends_days_of_a_longer_program():
+    two_weeks = {"workout_schedule": BASE["workout_schedule"] + copy.deepcopy(BASE["workout_schedule"])}
+    patch = diff_schedules(BASE, two_weeks)
+    assert len(patch["append"]) == 7
+    assert apply_patch(BASE, patch)["workout_schedule"] == two_weeks["workout_schedule"]
+
+def test_patch_leaves_the_original_unchanged():
+    original = copy.deepcopy(BASE)
+    apply_patch(BASE, diff_schedules(BASE, make_schedule({"Monday": ["Chest"], "Thursday": ["Back"]})))
+    assert BASE == original
+
+def test_merge_combines_separate_edits():
+    ours = make_schedule({"Monday": ["Chest", "Triceps"], "Wednesday": ["Back"], "Friday": ["Quads"]})
+    theirs = make_schedule({"Monday": ["Chest"], "Wednesday": ["Back", "Biceps"], "Friday": ["Quads"]})
+    merged, conflicts = merge_schedules(BASE, ours, theirs)
+    assert conflicts == []
+    assert workout_plan(merged) == {"Monday": ["Chest", "Triceps"], "Wednesday": ["Back", "Biceps"],
+                                    "Friday": ["Quads"]}
+
+def test_merge_rest_day_wins():
+    ours = make_schedule({"Monday": ["Chest"], "Wednesday": ["Back", "Biceps"], "Friday": ["Quads"]})
+    theirs = make_schedule({"Monday": ["Chest"], "Friday": ["Quads"]})
+    merged, conflicts = merge_schedules(BASE, ours, theirs)
+    assert "Wednesday" not in workout_plan(merged)
+    assert len(conflicts) == 1 and conflicts[0].startswith("Wednesday:")
+
+def test_merge_keeps_our_version_of_an_exercise_both_sides_added():
+    ours = make_schedule(workout_plan(BASE), {"Monday": [bench_press("Strength", 5, 6)]})
+    theirs = make_schedule(workout_plan(BASE), {"Monday": [bench_press("Hypertrophy", 4, 12)]})
+    merged, conflicts = merge_schedules(BASE, ours, theirs)
+    assert merged["workout_schedule"][0]["exercises"] == [bench_press("Strength", 5, 6)]
+    assert len(conflicts) == 1
+
+def test_merge_that_breaks_the_rules_falls_back_to_our_days():
+    # Each side is valid, but combined they give 6 workout days with Back on Monday and Tuesday
+    ours = make_schedule({"Monday": ["Chest"], "Tuesday": ["Back"], "Wednesday": ["Biceps"], "Friday": ["Quads"]})
+    theirs = make_schedule({"Monday": ["Back"], "Wednesday": ["Back"], "Thursday": ["Chest"], "Friday": ["Quads"],
+                            "Saturday": ["Calves"]})
+    exercise_data, _ = load_catalog()
+    assert schedule_violations(ours, exercise_data) == []
+    assert schedule_violations(theirs, exercise_data) == []
+
+    merged, conflicts = merge_schedules(BASE, ours, theirs)
+    assert schedule_violations(merged, exercise_data) == []
+    assert workout_plan(merged) == workout_plan(ours)
+    assert conflicts  # The user is told which days were kept from our side
+    assert {conflict.split(":")[0] for conflict in conflicts} == {"Monday", "Thursday", "Saturday"}
+
+def test_merge_keeps_their_valid_edits_next_to_a_fallback():
+    # Only the day that clashes falls back; their other valid edit survives
+    ours = make_schedule({"Monday": ["Chest"], "Tuesday": ["Biceps"], "Wednesday": ["Back"], "Friday": ["Quads"]})
+    theirs = make_schedule({"Monday": ["Chest", "Biceps"], "Wednesday": ["Back"], "Friday": ["Quads", "Hamstrings"]})
+    merged, conflicts = merge_schedules(BASE, ours, theirs)
+    exercise_data, _ = load_catalog()
+    assert schedule_violations(merged, exercise_data) == []
+    assert workout_plan(merged)["Monday"] == ["Chest"]
+    assert workout_plan(merged)["Friday"] == ["Quads", "Hamstrings"]
+    assert [conflict.split(":")[0] for conflict in conflicts] == ["Monday"]
@@ -0,0 +1,62 @@
+import os
+
+from fitness_data import load_schedule, make_exercise
+from schedule_model import ScheduleModel, snapshot_file_name
+
+# Tests for saving through the shared schedule model (locked, versioned and merged saves).
+
+def hydrated_model(file_path):
+    schedule_model = ScheduleModel(str(file_path))
+    schedule_model.hydrate({})
+    return schedule_model
+
+def saved_plan(file_path):
+    return {day_entry["name"]: day_entry["workout_purpose"]
+            for day_entry in load_schedule(str(file_path))["workout_schedule"] if not day_entry["rest"]}
+
+def test_save_writes_the_plan_and_bumps_the_version(tmp_path):
+    file_path = tmp_path / "schedule.json"
+    schedule_model = hydrated_model(file_path)
+    schedule_model.plan_days({"Monday": ["Chest"], "Thursday": ["Back"]})
+    saved_schedule, conflicts = schedule_model.save()
+    assert conflicts == []
+    assert saved_schedule["version"] == 1
+    assert saved_plan(file_path) == {"Monday": ["Chest"], "Thursday": ["Back"]}
+    assert hydrated_model(file_path).schedule == saved_schedule  # Read back through the snapshot
+
+def test_two_copies_saving_in_turn_keep_both_edits(tmp_path):
+    file_path = tmp_path / "schedule.json"
+    first_model = hydrated_model(file_path)
+    first_model.plan_days({"Monday": ["Chest"], "Thursday": ["Back"]})
+    first_model.save()
+    second_model = hydrated_model(file_path)
+
+    first_model.add_exercises("Chest", [make_exercise("Chest Dips", "Chest", "Strength")])
+    first_model.save()
+    second_model.add_exercises("Back", [make_exercise("Deadlifts", "Back", "Strength")])
+    saved_schedule, conflicts = second_model.save()  # Stale copy: merged with the first model's save
+    assert conflicts == []
+    saved_days = {day_entry["name"]: day_entry for day_entry in saved_schedule["workout_schedule"]}
+    assert [exercise["name"] for exercise in saved_days["Monday"]["exercises"]] == ["Chest Dips"]
+    assert [exercise["name"] for exercise in saved_days["Thursday"]["exercises"]] == ["Deadlifts"]
+    assert saved_schedule["version"] == 3
+
+def test_reset_overwrites_whatever_was_saved(tmp_path):
+    file_path = tmp_path / "schedule.json"
+    first_model = hydrated_model(file_path)
+    second_model = hydrated_model(file_path)
+    first_model.plan_days({"Monday": ["Chest"], "Thursday": ["Back"]})
+    first_model.save()
+    second_model.reset()
+    assert saved_plan(file_path) == {}
+    assert load_schedule(str(file_path))["version"] == 2
+    assert not second_model.has_plan()
+
+def test_hydrate_without_snapshot_writes_nothing(tmp_path):
+    file_path = tmp_path / "schedule.json"
+    hydrated_model(file_path).save()
+    os.remove(snapshot_file_name(str(file_path)))
+    schedule_model = ScheduleModel(str(file_path))
+    schedule_model.hydrate({}, write_snapshot=False)  # As in a startup-profiling run
+    assert not os.path.exists(snapshot_file_name(str(file_path)))
+    assert schedule_model.schedule == load_schedule(str(file_path))
@@ -0,0 +1,64 @@
+from itertools import product
+
+import pytest
+
+from fitness_data import load_catalog, get_intensity_profiles, make_exercise, exercise_sub_muscles
+from session_builder import SessionBuilder, exercise_minutes
+
+# Tests for the time-budgeted session builder. Run with "python -m pytest".
+
+def workout_day(muscles, exercises=()):
+    return {"name": "Tuesday", "rest": False, "workout_purpose": list(muscles), "exercises": list(exercises)}
+
+def covered_sub_muscles(exercise_objects, muscle_group_data):
+    return {(exercise_obj.muscle_group, sub_muscle) for exercise_obj in exercise_objects
+            for sub_muscle in exercise_sub_muscles(exercise_obj.exercise_name, exercise_obj.muscle_group,
+                                                   muscle_group_data)}
+
+def best_coverage_by_brute_force(muscle_name, exercise_names, budget_minutes, muscle_group_data):
+    # Most sub-muscles any mix of the exercises and intensities covers within the budget
+    best_coverage = 0
+    for choice in product([None] + list(get_intensity_profiles()), repeat=len(exercise_names)):
+        chosen_exercises = [make_exercise(exercise_name, muscle_name, focus_type)
+                            for exercise_name, focus_type in zip(exercise_names, choice) if focus_type]
+        if sum(exercise_minutes(exercise_obj) for exercise_obj in chosen_exercises) <= budget_minutes:
+            best_coverage = max(best_coverage, len(covered_sub_muscles(chosen_exercises, muscle_group_data)))
+    return best_coverage
+
+@pytest.mark.parametrize("budget_minutes", [0, 5, 12, 25, 45, 90])
+def test_session_fits_the_budget(budget_minutes):
+    exercise_data, muscle_group_data = load_catalog()
+    session = SessionBuilder(exercise_data, muscle_group_data).build_session(
+        workout_day(["Back", "Biceps", "Abs"]), budget_minutes)
+    total_minutes = sum(exercise_minutes(exercise_obj) for exercise_obj in session["exercises"])
+    assert total_minutes == session["minutes"] <= budget_minutes
+
+@pytest.mark.parametrize("budget_minutes", [6, 12, 20, 30])
+def test_session_covers_as_many_sub_muscles_as_possible(budget_minutes):
+    exercise_data, muscle_group_data = load_catalog()
+    session = SessionBuilder(exercise_data, muscle_group_data).build_session(workout_day(["Back"]), budget_minutes)
+    assert len(covered_sub_muscles(session["exercises"], muscle_group_data)) == best_coverage_by_brute_force(
+        "Back", exercise_data["Back"], budget_minutes, muscle_group_data)
+
+def test_generous_budget_covers_every_sub_muscle():
+    exercise_data, muscle_group_data = load_catalog()
+    session = SessionBuilder(exercise_data, muscle_group_data).build_session(workout_day(["Chest", "Back"]), 120)
+    assert covered_sub_muscles(session["exercises"], muscle_group_data) == {
+        (muscle_name, sub_muscle) for muscle_name in ("Chest", "Back")
+        for sub_muscle in muscle_group_data[muscle_name]}
+    assert session["uncovered_muscles"] == []
+
+def test_long_candidate_lists_are_handled():
+    # 30 candidates would be 4^30 mixes to try one by one
+    _, muscle_group_data = load_catalog()
+    exercise_data = {"Chest": [f"Chest Exercise {exercise_number}" for exercise_number in range(30)]}
+    session = SessionBuilder(exercise_data, muscle_group_data).build_session(workout_day(["Chest"]), 60)
+    assert 0 < session["minutes"] <= 60
+
+def test_kept_intensity_is_preferred():
+    exercise_data, muscle_group_data = load_catalog()
+    chosen_exercise = {"name": "Chest Dips", "muscle": "Chest", "focus_type": "Strength", "sets": 5, "reps": 6}
+    session = SessionBuilder(exercise_data, muscle_group_data).build_session(
+        workout_day(["Chest"], [chosen_exercise]), 60)
+    assert [(exercise_obj.exercise_name, exercise_obj.focus_type) for exercise_obj in session["exercises"]] == [
+        ("Chest Dips", "Strength")]
@@ -0,0 +1,33 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+# Cold-start budget for the V5 GUI: "--startup-budget" must pass within STARTUP_BUDGET_SECONDS.
+# The budget run needs a display for tkinter and is skipped without one.
+V5_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "V5 - 3DIP programming internal - Zane M.py")
+STARTUP_BUDGET_SECONDS = 1.5
+
+def display_available():
+    # tkinter can only open a window when there is a display
+    try:
+        import tkinter
+        tkinter.Tk().destroy()
+    except Exception:
+        return False
+    return True
+
+def run_v5(folder, *arguments):
+    return subprocess.run([sys.executable, V5_SCRIPT, *arguments], cwd=folder, capture_output=True, text=True)
+
+@pytest.mark.skipif(not display_available(), reason="needs a display")
+def test_cold_start_is_within_budget(tmp_path):
+    result = run_v5(tmp_path, "--startup-budget", str(STARTUP_BUDGET_SECONDS))
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert os.listdir(tmp_path) == []  # A measuring run writes no log, snapshot or history
+
+@pytest.mark.parametrize("arguments", [["--startup-budget"], ["--startup-budget", "soon"]])
+def test_bad_budget_is_a_usage_error(tmp_path, arguments):
+    result = run_v5(tmp_path, *arguments)
+    assert result.returncode == 2 and "--startup-budget" in result.stderr
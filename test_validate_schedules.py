@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+import validate_schedules
+from fitness_data import CATALOG_FILE, blank_schedule
+from catalog_workers import init_worker
+from schedule_rules import muscle_bits, blocked_muscles
+from validate_schedules import validate_file
+
+# Tests for the bulk validator's handling of malformed (hand-edited) schedule files.
+
+@pytest.fixture(autouse=True)
+def catalog_loaded():
+    init_worker(CATALOG_FILE)
+
+def write_monday(tmp_path, **monday_fields):
+    # Writes a schedule whose Monday trains Chest, with monday_fields overriding that day's entry
+    schedule_data = blank_schedule()
+    schedule_data["workout_schedule"][0].update({"rest": False, "workout_purpose": ["Chest"], **monday_fields})
+    file_path = tmp_path / "member.json"
+    file_path.write_text(json.dumps(schedule_data))
+    return str(file_path)
+
+@pytest.mark.parametrize("monday_fields", [{"exercises": None}, {"exercises": "oops"},
+                                           {"workout_purpose": [["Chest"]]}, {"rest": "no"}])
+def test_wrong_field_types_are_reported(tmp_path, monday_fields):
+    _, violations = validate_file(write_monday(tmp_path, **monday_fields))
+    assert [violation["rule"] for violation in violations] == ["bad_day_entry"]
+
+@pytest.mark.parametrize("exercise_entry", [{"name": ["Chest Dips"]}, {"sets": 3}, ["Chest Dips"], 7])
+def test_unreadable_exercises_are_reported(tmp_path, exercise_entry):
+    _, violations = validate_file(write_monday(tmp_path, exercises=[exercise_entry]))
+    # (A single workout day is also too few, which is reported after it)
+    assert [violation["rule"] for violation in violations] == ["bad_exercise", "workout_day_count"]
+
+def test_unexpected_errors_become_a_violation(tmp_path, monkeypatch):
+    def failing_check(schedule_data, exercise_data):
+        raise RuntimeError("rule bug")
+    monkeypatch.setattr(validate_schedules, "schedule_violations", failing_check)
+    _, violations = validate_file(write_monday(tmp_path))
+    assert [violation["rule"] for violation in violations] == ["internal_error"]
+
+def test_misspelled_muscles_get_no_bit_but_are_still_checked(tmp_path):
+    schedule_data = blank_schedule()
+    schedule_data["workout_schedule"][0].update(rest=False, workout_purpose=["Forearmz"])
+    schedule_data["workout_schedule"][1].update(rest=False, workout_purpose=["Forearmz"])
+    file_path = tmp_path / "member.json"
+    file_path.write_text(json.dumps(schedule_data))
+    _, violations = validate_file(str(file_path))
+    assert [violation["rule"] for violation in violations] == ["unknown_muscle", "unknown_muscle",
+                                                               "consecutive_muscles"]
+    assert "Forearmz" not in muscle_bits
+
+def test_blocked_muscles_with_a_misspelled_muscle():
+    assert blocked_muscles(["Monday", "Tuesday", "Thursday"],
+                           {"Monday": ["Chest", "Forearmz"], "Tuesday": ["Back"], "Thursday": ["Quads"]}) == {
+        "Monday": {"Back"}, "Tuesday": {"Chest", "Forearmz"}, "Thursday": set()}
+    assert blocked_muscles(["Monday", "Tuesday"], {"Monday": ["Chest"], "Tuesday": ["Back"]}) == {
+        "Monday": {"Back"}, "Tuesday": {"Chest"}}
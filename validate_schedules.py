@@ -0,0 +1,50 @@
+import sys
+import json
+import argparse
+from multiprocessing import Pool
+
+from fitness_data import CATALOG_FILE
+from schedule_rules import schedule_violations
+from catalog_workers import worker_exercise_data, init_worker, find_json_files
+
+# Bulk validator: checks every schedule file under a folder against the same rules as the GUI wizard.
+# Files are spread across worker processes and each violation is streamed out as one JSON line:
+#   {"file": "...", "rule": "...", "day": "...", "message": "..."}
+
+def validate_file(file_path):
+    # Validates a single schedule file and returns (file path, list of violations)
+    try:
+        with open(file_path, "r") as schedule_file:
+            schedule_data = json.load(schedule_file)
+    except (OSError, ValueError) as error:
+        return file_path, [{"rule": "unreadable", "day": None, "message": str(error)}]
+    try:
+        return file_path, schedule_violations(schedule_data, worker_exercise_data)
+    except Exception as error:  # One odd file must not stop the whole run
+        return file_path, [{"rule": "internal_error", "day": None, "message": f"Could not check file: {error!r}"}]
+
+def main(argument_list=None):
+    parser = argparse.ArgumentParser(description="Validate a folder tree of saved workout schedules.")
+    parser.add_argument("folder", help="folder to scan recursively for .json schedule files")
+    parser.add_argument("--catalog", default=CATALOG_FILE, help="exercise catalog to validate against")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="files handed to a worker at a time")
+    arguments = parser.parse_args(argument_list)
+
+    checked_files = 0
+    bad_files = 0
+    with Pool(arguments.processes, initializer=init_worker, initargs=(arguments.catalog,)) as worker_pool:
+        results = worker_pool.imap_unordered(validate_file, find_json_files(arguments.folder),
+                                             chunksize=arguments.chunk_size)
+        for file_path, violations in results:
+            checked_files += 1
+            if violations:
+                bad_files += 1
+            for violation in violations:
+                sys.stdout.write(json.dumps({"file": file_path, **violation}) + "\n")
+
+    print(f"Checked {checked_files} file(s), {bad_files} with violations.", file=sys.stderr)
+    return 1 if bad_files else 0
+
+if __name__ == "__main__":
+    sys.exit(main())